@@ -2,13 +2,20 @@
 Main CLI application using Typer.
 """
 
+import json
+import urllib.request
+from urllib.error import URLError
+
 import typer
 from rich.console import Console
 from rich.table import Table
 from typing import Optional
 
 from monorepo_core import get_settings, db_manager, logger
+from monorepo_core.cache import USER_COUNT_CACHE_KEYS, cache, user_cache_key
+from monorepo_core.migrations import migrate_is_active_to_boolean
 from monorepo_core.models import User, UserCreate
+from monorepo_core.search import install_user_search
 
 app = typer.Typer(
     name="monorepo-cli",
@@ -47,11 +54,126 @@ def db_init():
 
 
 @app.command()
-def user_list():
+def db_analyze():
+    """Refresh planner statistics (used by estimated total counts)."""
+    try:
+        with db_manager.engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+        console.print("✅ Statistics refreshed.", style="green")
+    except Exception as e:
+        console.print(f"❌ Failed to analyze database: {e}", style="red")
+        raise typer.Exit(1)
+
+
+@app.command()
+def db_pool_stats(
+    url: Optional[str] = typer.Option(
+        None, "--url", help="Base URL of the running web API"
+    ),
+):
+    """Show live connection pool statistics from the running web API."""
+    settings = get_settings()
+    base_url = url or f"http://{settings.api_host}:{settings.api_port}"
+    if base_url.startswith("http://0.0.0.0"):
+        base_url = base_url.replace("0.0.0.0", "127.0.0.1", 1)
+
+    try:
+        with urllib.request.urlopen(f"{base_url.rstrip('/')}/db/pool", timeout=5) as response:
+            stats = json.load(response)
+    except (URLError, ValueError) as e:
+        console.print(f"❌ Failed to fetch pool statistics: {e}", style="red")
+        raise typer.Exit(1)
+
+    table = Table(title="Database Pool Statistics")
+    table.add_column("Database", style="cyan")
+    table.add_column("Engine", style="cyan")
+    table.add_column("Size", style="green")
+    table.add_column("Checked Out", style="green")
+    table.add_column("Overflow", style="green")
+    table.add_column("Checkouts", style="blue")
+    table.add_column("Timeouts", style="red")
+    table.add_column("Avg Wait (ms)", style="yellow")
+    table.add_column("Max Wait (ms)", style="yellow")
+
+    for database, engines in stats.items():
+        for kind, pool in engines.items():
+            table.add_row(
+                database,
+                kind,
+                str(pool.get("size", "-")),
+                str(pool.get("checked_out", "-")),
+                str(pool.get("overflow", "-")),
+                str(pool["checkouts"]),
+                str(pool["timeouts"]),
+                f"{pool['wait_seconds_avg'] * 1000:.2f}",
+                f"{pool['wait_seconds_max'] * 1000:.2f}",
+            )
+
+    console.print(table)
+
+
+@app.command()
+def db_migrate_is_active(
+    batch_size: int = typer.Option(
+        1000, "--batch-size", min=1, help="Rows converted per transaction"
+    ),
+    pause: float = typer.Option(
+        0.0, "--pause", min=0.0, help="Seconds to sleep between batches"
+    ),
+    keep_legacy: bool = typer.Option(
+        False, "--keep-legacy", help="Keep the old text column as is_active_legacy"
+    ),
+):
+    """Convert users.is_active to a boolean column in batches, online."""
+    try:
+        stats = migrate_is_active_to_boolean(
+            db_manager.engine,
+            batch_size=batch_size,
+            pause_seconds=pause,
+            drop_legacy=not keep_legacy,
+        )
+    except Exception as e:
+        console.print(f"❌ Migration failed: {e}", style="red")
+        raise typer.Exit(1)
+
+    if stats["swapped"]:
+        console.print(
+            f"✅ Converted {stats['rows']} users in {stats['batches']} batches.",
+            style="green",
+        )
+    else:
+        console.print("✅ users.is_active is already boolean.", style="green")
+
+
+@app.command()
+def db_install_search():
+    """Build the user search index on an existing database."""
+    try:
+        installed = install_user_search(db_manager.engine)
+    except Exception as e:
+        console.print(f"❌ Failed to build the search index: {e}", style="red")
+        raise typer.Exit(1)
+    if installed:
+        console.print("✅ User search index ready.", style="green")
+    else:
+        console.print(
+            "⚠️ This database cannot index search; searches will scan.", style="yellow"
+        )
+
+
+@app.command()
+def user_list(
+    active: Optional[bool] = typer.Option(
+        None, "--active/--inactive", help="Only list active or inactive users"
+    ),
+):
     """List all users."""
     try:
         with db_manager.get_session() as session:
-            users = session.query(User).all()
+            query = session.query(User).order_by(User.id)
+            if active is not None:
+                query = query.filter(User.is_active if active else ~User.is_active)
+            users = query.all()
 
             if not users:
                 console.print("No users found.", style="yellow")
@@ -70,7 +192,7 @@ def user_list():
                     user.username,
                     user.email,
                     user.full_name or "",
-                    user.is_active
+                    "yes" if user.is_active else "no",
                 )
 
             console.print(table)
@@ -107,6 +229,7 @@ def user_create(
 
             session.add(user)
             session.commit()
+            cache.delete(*USER_COUNT_CACHE_KEYS)
 
             console.print(f"✅ User '{username}' created successfully!", style="green")
 
@@ -131,6 +254,7 @@ def user_delete(
             username = user.username
             session.delete(user)
             session.commit()
+            cache.delete(user_cache_key(user_id), *USER_COUNT_CACHE_KEYS)
 
             console.print(f"✅ User '{username}' deleted successfully!", style="green")
 
@@ -1,15 +1,36 @@
 """
 Core utilities and shared code for the monorepo.
+
+Public names are imported from their submodules on first access so that
+``import monorepo_core`` stays cheap for commands that never touch them.
 """
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 
-from .config import Settings, get_settings
-from .database import Base, DatabaseManager, db_manager
-from .models import BaseModel
-from .utils import logger
+if TYPE_CHECKING:
+    from .cache import TwoTierCache
+    from .config import Settings, get_settings
+    from .database import Base, DatabaseManager, db_manager
+    from .models import BaseModel
+    from .utils import logger
+
+# Public name -> submodule that defines it
+_LAZY_ATTRIBUTES = {
+    "TwoTierCache": ".cache",
+    "Settings": ".config",
+    "get_settings": ".config",
+    "Base": ".database",
+    "DatabaseManager": ".database",
+    "db_manager": ".database",
+    "BaseModel": ".models",
+    "logger": ".utils",
+}
 
 __all__ = [
+    "TwoTierCache",
     "Settings",
     "get_settings",
     "Base",
@@ -17,4 +38,18 @@ __all__ = [
     "db_manager",
     "BaseModel",
     "logger",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
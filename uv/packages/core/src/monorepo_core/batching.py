@@ -0,0 +1,208 @@
+"""
+Batch loaders that merge single-key lookups into one bulk query.
+"""
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .models import User
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+# Keys per batch call; keeps IN lists well under bind parameter limits
+DEFAULT_MAX_BATCH_SIZE = 1000
+
+_MISSING = object()
+
+
+class BatchLoader(Generic[K, V]):
+    """Merges ``load`` calls made in the same event-loop turn into one batch.
+
+    ``batch_fn`` receives the distinct keys and returns a dict of the ones
+    found; missing keys load as ``None``. Results are memoized for the
+    loader's lifetime, so create one per request or task. Batches run one
+    after another, which keeps a loader bound to an ``AsyncSession`` safe.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        """Initialize loader around ``batch_fn``."""
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._pending: List[K] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def _future(self, key: K) -> asyncio.Future:
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            if not self._pending:
+                # Dispatch once every task already runnable has had its turn
+                loop.call_soon(self._dispatch)
+            self._pending.append(key)
+        return future
+
+    def _dispatch(self):
+        batch = [(key, self._futures[key]) for key in self._pending]
+        self._pending = []
+        self._task = asyncio.ensure_future(self._run(batch, self._task))
+
+    async def _run(
+        self,
+        batch: List[Tuple[K, asyncio.Future]],
+        previous: Optional[asyncio.Task],
+    ):
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+        for start in range(0, len(batch), self.max_batch_size):
+            chunk = batch[start:start + self.max_batch_size]
+            self.batches += 1
+            try:
+                values = await self.batch_fn([key for key, _ in chunk])
+            except Exception as e:
+                for key, future in chunk:
+                    # Forget failures so a later load retries them
+                    if self._futures.get(key) is future:
+                        del self._futures[key]
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for key, future in chunk:
+                if not future.done():
+                    future.set_result(values.get(key))
+
+    async def load(self, key: K) -> Optional[V]:
+        """Load one key, batched with other loads made meanwhile."""
+        return await self._future(key)
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """Load several keys, returned in the order given."""
+        return list(await asyncio.gather(*(self._future(key) for key in keys)))
+
+    def clear(self):
+        """Forget memoized results."""
+        self._futures = {key: self._futures[key] for key in self._pending}
+
+
+class Deferred(Generic[V]):
+    """Handle for a key queued on a ``SyncBatchLoader``."""
+
+    __slots__ = ("_loader", "_key")
+
+    def __init__(self, loader: "SyncBatchLoader", key):
+        self._loader = loader
+        self._key = key
+
+    def get(self) -> Optional[V]:
+        """The loaded value, loading every queued key first if needed."""
+        return self._loader._resolve(self._key)
+
+
+class SyncBatchLoader(Generic[K, V]):
+    """Blocking counterpart of ``BatchLoader`` for worker tasks and the CLI.
+
+    ``defer`` queues keys without querying; the first ``Deferred.get``
+    loads everything queued so far with one ``batch_fn`` call.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[K]], Dict[K, V]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        """Initialize loader around ``batch_fn``."""
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self._values: Dict[K, Optional[V]] = {}
+        self._pending: Dict[K, None] = {}
+        self._lock = threading.Lock()
+
+    def defer(self, key: K) -> Deferred:
+        """Queue a key for the next batch."""
+        with self._lock:
+            if key not in self._values:
+                self._pending[key] = None
+        return Deferred(self, key)
+
+    def _resolve(self, key: K) -> Optional[V]:
+        with self._lock:
+            value = self._values.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            self._pending[key] = None
+            keys, self._pending = list(self._pending), {}
+            for start in range(0, len(keys), self.max_batch_size):
+                chunk = keys[start:start + self.max_batch_size]
+                self.batches += 1
+                values = self.batch_fn(chunk)
+                for chunk_key in chunk:
+                    self._values[chunk_key] = values.get(chunk_key)
+            return self._values[key]
+
+    def load(self, key: K) -> Optional[V]:
+        """Load one key together with everything already queued."""
+        return self.defer(key).get()
+
+    def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """Load several keys in one batch, returned in the order given."""
+        deferred = [self.defer(key) for key in keys]
+        return [item.get() for item in deferred]
+
+    def clear(self):
+        """Forget memoized results."""
+        with self._lock:
+            self._values.clear()
+
+
+def _users_query(ids: List[int], columns: Optional[Sequence[str]]):
+    if columns is None:
+        return select(User).where(User.id.in_(ids))
+    names = dict.fromkeys(("id", *columns))
+    return select(*(getattr(User, name) for name in names)).where(User.id.in_(ids))
+
+
+def users_by_id(
+    session: Session,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    columns: Optional[Sequence[str]] = None,
+) -> SyncBatchLoader[int, User]:
+    """Loader fetching users by id on a sync session.
+
+    With ``columns``, only those columns (and ``id``) are selected and rows
+    are loaded instead of ``User`` instances.
+    """
+
+    def load(ids: List[int]) -> Dict[int, User]:
+        result = session.execute(_users_query(ids, columns))
+        rows = result.scalars() if columns is None else result
+        return {row.id: row for row in rows}
+
+    return SyncBatchLoader(load, max_batch_size)
+
+
+def async_users_by_id(
+    session: AsyncSession,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    columns: Optional[Sequence[str]] = None,
+) -> BatchLoader[int, User]:
+    """Loader fetching users by id on an async session; see ``users_by_id``."""
+
+    async def load(ids: List[int]) -> Dict[int, User]:
+        result = await session.execute(_users_query(ids, columns))
+        rows = result.scalars() if columns is None else result
+        return {row.id: row for row in rows}
+
+    return BatchLoader(load, max_batch_size)
@@ -0,0 +1,452 @@
+"""
+Two-tier read-through cache: an in-process LRU backed by Redis.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, cast
+
+from .config import get_settings
+from .lazy import LazyProxy
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is an optional extra
+    redis = None
+    aioredis = None
+
+# Returned by the tiers for absent or expired keys; ``None`` is never cached
+MISSING = object()
+
+
+def user_cache_key(user_id: int) -> str:
+    """Cache key for a single user."""
+    # v2: is_active became a boolean; never serve the old string payloads
+    return f"user:v2:{user_id}"
+
+
+def user_count_cache_key(active: Optional[bool] = None) -> str:
+    """Cache key for the number of users, optionally filtered by ``active``."""
+    return "users:count:" + {None: "all", True: "active", False: "inactive"}[active]
+
+
+# Every cached user count, for invalidation after writes
+USER_COUNT_CACHE_KEYS = tuple(user_count_cache_key(active) for active in (None, True, False))
+
+
+class LocalCache:
+    """Thread-safe in-process LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 5.0):
+        """Initialize local cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Get a value, or ``MISSING`` if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full."""
+        # Jitter expiry so keys cached together do not all expire together
+        ttl = (self.ttl if ttl is None else ttl) * random.uniform(0.9, 1.0)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """Remove a value if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every value."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TwoTierCache:
+    """Read-through cache with a local LRU tier in front of Redis.
+
+    Values must be JSON-serializable. The local tier uses a short TTL
+    because other processes can only invalidate the shared Redis tier.
+    Concurrent misses for the same key are coalesced into a single load.
+
+    Loaded values are not stored for ``invalidation_window`` seconds after
+    their key is invalidated: a load that started before the write, or one
+    served by a lagging replica, would otherwise cache the old value.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        local_maxsize: Optional[int] = None,
+        local_ttl: Optional[float] = None,
+        redis_ttl: Optional[float] = None,
+        invalidation_window: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        use_redis: Optional[bool] = None,
+        prefix: str = "monorepo:cache:",
+    ):
+        """Initialize cache from explicit arguments or settings."""
+        settings = get_settings()
+        self.enabled = settings.cache_enabled if enabled is None else enabled
+        if use_redis is None:
+            use_redis = settings.cache_redis_enabled
+        self.redis_url = (redis_url or settings.redis_url) if use_redis else None
+        self.redis_ttl = redis_ttl or settings.cache_redis_ttl_seconds
+        self.redis_timeout = settings.cache_redis_timeout_seconds
+        self.redis_retry_seconds = settings.cache_redis_retry_seconds
+        self.prefix = prefix
+        if invalidation_window is None:
+            invalidation_window = settings.cache_invalidation_window_seconds
+        self.invalidation_window = invalidation_window
+
+        self.local = LocalCache(
+            maxsize=local_maxsize or settings.cache_local_maxsize,
+            ttl=local_ttl or settings.cache_local_ttl_seconds,
+        )
+        # Keys invalidated within the window, as seen by this process
+        self._invalidated = LocalCache(
+            maxsize=self.local.maxsize, ttl=invalidation_window
+        )
+
+        self._redis = None
+        self._async_redis = None
+        self._redis_down_until = 0.0
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._key_locks_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._counters_lock = threading.Lock()
+        self._counters = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "coalesced": 0,
+            "redis_errors": 0,
+        }
+
+    def _count(self, name: str):
+        with self._counters_lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and the size of the local tier."""
+        with self._counters_lock:
+            return {**self._counters, "local_size": len(self.local)}
+
+    # Redis tier
+
+    def _redis_available(self) -> bool:
+        return (
+            self.redis_url is not None
+            and redis is not None
+            and time.monotonic() >= self._redis_down_until
+        )
+
+    def _redis_failed(self):
+        """Count a Redis error and stop using Redis for a while."""
+        self._count("redis_errors")
+        self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+
+    def _redis_client(self):
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                self.redis_url,
+                socket_timeout=self.redis_timeout,
+                socket_connect_timeout=self.redis_timeout,
+            )
+        return self._redis
+
+    def _async_redis_client(self):
+        if self._async_redis is None:
+            self._async_redis = aioredis.Redis.from_url(
+                self.redis_url,
+                socket_timeout=self.redis_timeout,
+                socket_connect_timeout=self.redis_timeout,
+            )
+        return self._async_redis
+
+    def _invalidation_key(self, key: str) -> str:
+        return f"{self.prefix}invalidated:{key}"
+
+    def _invalidate_local(self, keys) -> list:
+        """Drop keys locally and return the Redis commands invalidating them."""
+        commands = [("delete", [self.prefix + key for key in keys], {})]
+        for key in keys:
+            self.local.delete(key)
+            # Callers arriving after the write must not join an older load
+            self._inflight.pop(key, None)
+            if self.invalidation_window > 0:
+                self._invalidated.set(key, True)
+                commands.append((
+                    "set",
+                    [self._invalidation_key(key), 1],
+                    {"px": int(self.invalidation_window * 1000)},
+                ))
+        return commands
+
+    # Sync API
+
+    def get(self, key: str) -> Any:
+        """Get a value from the nearest tier, or ``MISSING``."""
+        if not self.enabled:
+            return MISSING
+
+        value = self.local.get(key)
+        if value is not MISSING:
+            self._count("local_hits")
+            return value
+
+        if self._redis_available():
+            try:
+                raw = self._redis_client().get(self.prefix + key)
+            except redis.RedisError:
+                self._redis_failed()
+            else:
+                if raw is not None:
+                    value = json.loads(raw)
+                    self.local.set(key, value)
+                    self._count("redis_hits")
+                    return value
+
+        self._count("misses")
+        return MISSING
+
+    def _ttls(self, ttl: Optional[float]) -> tuple:
+        if ttl is None:
+            return None, self.redis_ttl
+        return min(ttl, self.local.ttl), ttl
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value in both tiers, for at most ``ttl`` seconds if given."""
+        if not self.enabled or value is None:
+            return
+
+        local_ttl, redis_ttl = self._ttls(ttl)
+        self.local.set(key, value, local_ttl)
+        if self._redis_available():
+            try:
+                self._redis_client().set(
+                    self.prefix + key, json.dumps(value), px=int(redis_ttl * 1000)
+                )
+            except redis.RedisError:
+                self._redis_failed()
+
+    def delete(self, *keys: str):
+        """Invalidate keys in both tiers."""
+        if not keys:
+            return
+        commands = self._invalidate_local(keys)
+        if self._redis_available():
+            try:
+                pipe = self._redis_client().pipeline(transaction=False)
+                for name, args, kwargs in commands:
+                    getattr(pipe, name)(*args, **kwargs)
+                pipe.execute()
+            except redis.RedisError:
+                self._redis_failed()
+
+    def _recently_invalidated(self, key: str) -> bool:
+        if self.invalidation_window <= 0:
+            return False
+        if self._invalidated.get(key) is not MISSING:
+            return True
+        if self._redis_available():
+            try:
+                return bool(self._redis_client().exists(self._invalidation_key(key)))
+            except redis.RedisError:
+                self._redis_failed()
+        return False
+
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        allow_stale: bool = False,
+    ) -> Any:
+        """Get a value, calling ``loader`` once across threads on a miss.
+
+        ``None`` results are returned but not cached. With ``allow_stale``
+        loads are cached even within the invalidation window, for values
+        allowed to lag writes (such as counts).
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        with self._key_locks_lock:
+            lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                # Another thread may have loaded the key while we waited
+                value = self.local.get(key) if self.enabled else MISSING
+                if value is not MISSING:
+                    self._count("coalesced")
+                    return value
+
+                self._count("loads")
+                value = loader()
+                if allow_stale or not self._recently_invalidated(key):
+                    self.set(key, value, ttl)
+                return value
+        finally:
+            with self._key_locks_lock:
+                if self._key_locks.get(key) is lock and not lock.locked():
+                    del self._key_locks[key]
+
+    # Async API
+
+    async def aget(self, key: str) -> Any:
+        """Get a value from the nearest tier without blocking the loop."""
+        if not self.enabled:
+            return MISSING
+
+        value = self.local.get(key)
+        if value is not MISSING:
+            self._count("local_hits")
+            return value
+
+        if self._redis_available():
+            try:
+                raw = await self._async_redis_client().get(self.prefix + key)
+            except redis.RedisError:
+                self._redis_failed()
+            else:
+                if raw is not None:
+                    value = json.loads(raw)
+                    self.local.set(key, value)
+                    self._count("redis_hits")
+                    return value
+
+        self._count("misses")
+        return MISSING
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value in both tiers without blocking the loop."""
+        if not self.enabled or value is None:
+            return
+
+        local_ttl, redis_ttl = self._ttls(ttl)
+        self.local.set(key, value, local_ttl)
+        if self._redis_available():
+            try:
+                await self._async_redis_client().set(
+                    self.prefix + key, json.dumps(value), px=int(redis_ttl * 1000)
+                )
+            except redis.RedisError:
+                self._redis_failed()
+
+    async def adelete(self, *keys: str):
+        """Invalidate keys in both tiers without blocking the loop."""
+        if not keys:
+            return
+        commands = self._invalidate_local(keys)
+        if self._redis_available():
+            try:
+                pipe = self._async_redis_client().pipeline(transaction=False)
+                for name, args, kwargs in commands:
+                    getattr(pipe, name)(*args, **kwargs)
+                await pipe.execute()
+            except redis.RedisError:
+                self._redis_failed()
+
+    async def _arecently_invalidated(self, key: str) -> bool:
+        if self.invalidation_window <= 0:
+            return False
+        if self._invalidated.get(key) is not MISSING:
+            return True
+        if self._redis_available():
+            try:
+                return bool(
+                    await self._async_redis_client().exists(self._invalidation_key(key))
+                )
+            except redis.RedisError:
+                self._redis_failed()
+        return False
+
+    async def aget_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        allow_stale: bool = False,
+    ) -> Any:
+        """Get a value, awaiting ``loader`` once per key on a miss; see ``get_or_load``.
+
+        Concurrent callers missing the same key wait for the first
+        caller's load instead of each querying the database. If that
+        caller is cancelled, the waiters load the key again themselves.
+        """
+        value = await self.aget(key)
+        if value is not MISSING:
+            return value
+
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self._count("coalesced")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Re-raise only our own cancellation, not the loader's
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self._count("loads")
+            value = await loader()
+            if allow_stale or not await self._arecently_invalidated(key):
+                await self.aset(key, value, ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def aclose(self):
+        """Close Redis connections."""
+        if self._async_redis is not None:
+            await self._async_redis.aclose()
+            self._async_redis = None
+        if self._redis is not None:
+            self._redis.close()
+            self._redis = None
+
+
+# Global cache instance, built on first use
+cache = cast(TwoTierCache, LazyProxy(TwoTierCache))
@@ -3,7 +3,7 @@ Configuration management using Pydantic settings.
 """
 
 from functools import lru_cache
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -17,6 +17,76 @@ class Settings(BaseSettings):
         default="sqlite:///./app.db",
         description="Database URL"
     )
+    async_database_url: Optional[str] = Field(
+        default=None,
+        description="Async database URL (derived from database_url when unset)"
+    )
+    database_replica_urls: List[str] = Field(
+        default_factory=list,
+        description="Read replica database URLs used for read-only sessions"
+    )
+    database_replica_retry_seconds: float = Field(
+        default=30.0,
+        description="Seconds an unreachable replica is kept out of rotation"
+    )
+    database_pool_size: int = Field(
+        default=5,
+        description="Connections kept open in each engine's pool"
+    )
+    database_max_overflow: int = Field(
+        default=10,
+        description="Extra connections allowed beyond the pool size under load"
+    )
+    database_pool_timeout: float = Field(
+        default=30.0,
+        description="Seconds to wait for a pooled connection before failing"
+    )
+    database_pool_fail_fast: bool = Field(
+        default=True,
+        description="Reject request sessions while the pool is exhausted instead of waiting"
+    )
+    database_pool_recycle: int = Field(
+        default=-1,
+        description="Seconds after which pooled connections are replaced (-1 disables)"
+    )
+    database_pool_pre_ping: bool = Field(
+        default=False,
+        description="Test pooled connections for liveness before each checkout"
+    )
+    database_query_stats_enabled: bool = Field(
+        default=True,
+        description="Time every SQL statement and attribute it to the current request or task"
+    )
+    database_slow_query_ms: float = Field(
+        default=200.0,
+        description="Log statements slower than this many milliseconds (0 disables)"
+    )
+
+    # SQLite
+    sqlite_high_throughput: bool = Field(
+        default=True,
+        description="Apply the SQLite pragmas below to every new file-backed connection"
+    )
+    sqlite_journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = Field(
+        default="WAL",
+        description="SQLite journal mode (WAL lets readers run alongside a writer)"
+    )
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = Field(
+        default="NORMAL",
+        description="SQLite synchronous level"
+    )
+    sqlite_mmap_size: int = Field(
+        default=256 * 1024 * 1024,
+        description="Bytes of the SQLite database file to memory-map"
+    )
+    sqlite_cache_size: int = Field(
+        default=-64000,
+        description="SQLite page cache size (negative values are KiB)"
+    )
+    sqlite_busy_timeout_ms: int = Field(
+        default=5000,
+        description="Milliseconds SQLite waits on a locked database before failing"
+    )
 
     # Redis
     redis_url: str = Field(
@@ -24,10 +94,110 @@ class Settings(BaseSettings):
         description="Redis URL for caching and message broker"
     )
 
+    # Cache
+    cache_enabled: bool = Field(default=True, description="Enable the read-through cache")
+    cache_local_maxsize: int = Field(
+        default=10000,
+        description="Entries kept in each process's in-memory cache tier"
+    )
+    cache_local_ttl_seconds: float = Field(
+        default=5.0,
+        description="TTL of the in-memory tier (bounds staleness across processes)"
+    )
+    cache_redis_enabled: bool = Field(
+        default=True,
+        description="Back the in-memory tier with Redis at redis_url"
+    )
+    cache_redis_ttl_seconds: float = Field(default=300.0, description="TTL of the Redis tier")
+    cache_invalidation_window_seconds: float = Field(
+        default=5.0,
+        description="Seconds after an invalidation during which loaded values are "
+        "not cached; should exceed replica lag"
+    )
+    cache_redis_timeout_seconds: float = Field(
+        default=0.1,
+        description="Socket timeout for cache Redis calls"
+    )
+    cache_redis_retry_seconds: float = Field(
+        default=30.0,
+        description="Seconds the cache skips Redis after a Redis error"
+    )
+
     # API
     api_host: str = Field(default="0.0.0.0", description="API host")
     api_port: int = Field(default=8000, description="API port")
     api_debug: bool = Field(default=False, description="Debug mode")
+    api_max_page_size: int = Field(
+        default=1000,
+        description="Largest page size list endpoints will return"
+    )
+    api_bulk_max_rows: int = Field(
+        default=50000,
+        description="Most rows accepted by a single bulk import request"
+    )
+    api_bulk_chunk_size: int = Field(
+        default=1000,
+        description="Rows inserted per statement and transaction in bulk imports"
+    )
+    api_export_chunk_size: int = Field(
+        default=1000,
+        description="Rows fetched from the server-side cursor per export chunk"
+    )
+    api_count_cache_ttl_seconds: float = Field(
+        default=60.0,
+        description="TTL of cached X-Total-Count values (user writes also invalidate them)"
+    )
+    api_busy_retry_after_seconds: int = Field(
+        default=1,
+        description="Retry-After sent with 503 responses when the database is busy"
+    )
+
+    # Readiness
+    readiness_refresh_seconds: float = Field(
+        default=5.0,
+        description="Seconds between background refreshes of the /ready checks"
+    )
+    readiness_check_timeout_seconds: float = Field(
+        default=2.0,
+        description="Seconds each readiness check may take before counting as failed"
+    )
+    readiness_redis_required: Optional[bool] = Field(
+        default=None,
+        description="Report not ready while Redis is unreachable (otherwise only reported); "
+        "by default only when rate limiting is stored in Redis"
+    )
+
+    # Rate limiting
+    rate_limit_enabled: bool = Field(default=False, description="Enable request rate limiting")
+    rate_limit_backend: Literal["memory", "redis"] = Field(
+        default="memory",
+        description="Token bucket storage (redis shares limits across processes)"
+    )
+    rate_limit_requests_per_second: float = Field(
+        default=20.0,
+        description="Sustained requests per second allowed per client and route"
+    )
+    rate_limit_burst: int = Field(
+        default=100,
+        description="Requests a client may burst per route before being throttled"
+    )
+    rate_limit_max_concurrent: int = Field(
+        default=10,
+        description="Requests a client may have in flight at once in this process (0 disables)"
+    )
+    rate_limit_client_header: Optional[str] = Field(
+        default=None,
+        description="Header identifying the client (e.g. X-API-Key); the client address when unset"
+    )
+    rate_limit_trusted_proxies: List[str] = Field(
+        default_factory=list,
+        description="Proxy addresses or networks whose X-Forwarded-For is trusted; "
+        "behind a proxy, leaving this empty limits the proxy as one client"
+    )
+    rate_limit_exempt_paths: List[str] = Field(
+        default_factory=lambda: ["/health", "/ready", "/metrics"],
+        description="Paths never rate limited, such as probes and scrapes"
+    )
 
     # Security
     secret_key: str = Field(
@@ -37,6 +207,30 @@ class Settings(BaseSettings):
 
     # Logging
     log_level: str = Field(default="INFO", description="Log level")
+    log_format: Literal["text", "json"] = Field(
+        default="text",
+        description="Log line format (json emits one compact object per record)"
+    )
+    log_queue_enabled: bool = Field(
+        default=True,
+        description="Hand records to a background thread instead of writing inline"
+    )
+    log_queue_size: int = Field(
+        default=10000,
+        description="Records buffered for the background thread before new ones are dropped"
+    )
+    log_sample_rate: int = Field(
+        default=10,
+        description="Keep 1 in N records below WARNING per logger and message template (1 keeps all)"
+    )
+    log_sample_rates: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Per message template or logger name overrides of log_sample_rate"
+    )
+    log_sample_summary_seconds: float = Field(
+        default=60.0,
+        description="Seconds between summaries of how many sampled records were suppressed"
+    )
 
     # Environment
     environment: str = Field(default="development", description="Environment name")
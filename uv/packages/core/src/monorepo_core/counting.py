@@ -0,0 +1,112 @@
+"""
+User totals for paginated listings: exact, cached, or estimated from statistics.
+"""
+
+import json
+from typing import Literal, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import cache, user_count_cache_key
+from .config import get_settings
+from .models import User
+
+CountMode = Literal["exact", "cached", "estimated"]
+
+
+def _filtered(query, active: Optional[bool]):
+    if active is None:
+        return query
+    return query.where(User.is_active if active else ~User.is_active)
+
+
+async def count_users(db: AsyncSession, active: Optional[bool] = None) -> int:
+    """Exact number of users, scanning the table (or an index)."""
+    return await db.scalar(_filtered(select(func.count()).select_from(User), active))
+
+
+async def cached_count_users(db: AsyncSession, active: Optional[bool] = None) -> int:
+    """Exact count, reused for ``api_count_cache_ttl_seconds`` or until a write."""
+    return await cache.aget_or_load(
+        user_count_cache_key(active),
+        lambda: count_users(db, active),
+        ttl=get_settings().api_count_cache_ttl_seconds,
+        # Counts may lag writes by design; keep caching while users sign up
+        allow_stale=True,
+    )
+
+
+async def _estimate_postgresql(db: AsyncSession, active: Optional[bool]) -> Optional[int]:
+    if active is None:
+        estimate = await db.scalar(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": User.__tablename__},
+        )
+    else:
+        # The planner's row estimate for the filtered scan
+        query = _filtered(select(User.id), active).compile(
+            db.get_bind(), compile_kwargs={"literal_binds": True}
+        )
+        plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {query}"))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = plan[0]["Plan"]["Plan Rows"]
+    # reltuples is -1 until the table is first vacuumed or analyzed
+    return None if estimate is None or estimate < 0 else int(estimate)
+
+
+async def _estimate_sqlite(db: AsyncSession, active: Optional[bool]) -> Optional[int]:
+    analyzed = await db.scalar(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+    )
+    if not analyzed:
+        return None
+    result = await db.execute(
+        text("SELECT idx, stat FROM sqlite_stat1 WHERE tbl = :table"),
+        {"table": User.__tablename__},
+    )
+    # The first number of each index's stat is the rows it covers
+    rows = {idx: int(stat.split()[0]) for idx, stat in result.all() if stat}
+    if not rows:
+        return None
+    total = max(rows.values())
+    if active is None:
+        return total
+    active_rows = rows.get("ix_users_active_id")
+    if active_rows is None:
+        return None
+    return active_rows if active else total - active_rows
+
+
+async def estimate_count_users(
+    db: AsyncSession, active: Optional[bool] = None
+) -> Optional[int]:
+    """Approximate number of users from planner statistics, without counting.
+
+    Uses ``pg_class.reltuples`` (or the planner's estimate when filtered) on
+    PostgreSQL and ``sqlite_stat1`` on SQLite, so it is only as fresh as the
+    last ``ANALYZE``. Returns None when no statistics are available.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return await _estimate_postgresql(db, active)
+    if dialect == "sqlite":
+        return await _estimate_sqlite(db, active)
+    return None
+
+
+async def total_users(
+    db: AsyncSession, mode: CountMode, active: Optional[bool] = None
+) -> Tuple[int, CountMode]:
+    """Count users with the given precision; returns the count and the mode used.
+
+    Estimates fall back to a cached count when statistics are missing.
+    """
+    if mode == "exact":
+        return await count_users(db, active), "exact"
+    if mode == "estimated":
+        estimate = await estimate_count_users(db, active)
+        if estimate is not None:
+            return estimate, "estimated"
+    return await cached_count_users(db, active), "cached"
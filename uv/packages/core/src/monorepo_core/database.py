@@ -2,34 +2,435 @@
 Database management utilities.
 """
 
-from contextlib import contextmanager
-from typing import Generator
+import functools
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, cast
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 
-from .config import get_settings
+from .config import Settings, get_settings
+from .lazy import LazyProxy
+from .query_stats import instrument_engine
 
 # Create the declarative base
 Base = declarative_base()
 
+# Async driver to use for each backend when deriving an async URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
 
-class DatabaseManager:
-    """Database connection and session management."""
+# Drivers that already speak asyncio
+ASYNC_DRIVER_NAMES = {"aiosqlite", "asyncpg", "aiomysql", "asyncmy", "psycopg"}
+
+
+def to_async_url(database_url: str) -> str:
+    """Convert a sync database URL to the equivalent async driver URL."""
+    url = make_url(database_url)
+
+    if url.get_driver_name() in ASYNC_DRIVER_NAMES:
+        return url.render_as_string(hide_password=False)
+
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for database backend: {backend}")
+
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+class DatabaseBusyError(Exception):
+    """Raised when a request session is refused because the pool is exhausted."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("No database connection available")
+        self.retry_after = retry_after
+
+
+class PoolStats:
+    """Counters describing how long callers wait for pooled connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.rejections = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, wait_seconds: float):
+        """Record a successful checkout and the time spent waiting for it."""
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def record_timeout(self, wait_seconds: float):
+        """Record a checkout that gave up after ``pool_timeout``."""
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def record_rejection(self):
+        """Record a session refused up front because the pool was exhausted."""
+        with self._lock:
+            self.rejections += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters as a plain dictionary."""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "rejections": self.rejections,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_avg": (
+                    self.wait_seconds_total / attempts if attempts else 0.0
+                ),
+            }
+
+
+def _time_pool_checkouts(engine, stats: PoolStats):
+    """Time every checkout from ``engine``'s queue pool into ``stats``.
+
+    Wraps the pool's public ``connect()``, which the engine calls for each
+    connection. ``Engine.dispose()`` swaps in a recreated pool, so the
+    wrapper is re-applied from the ``engine_disposed`` event.
+    """
+
+    def wrap(pool):
+        if not isinstance(pool, QueuePool):
+            return
+        connect = pool.connect
+
+        def timed_connect():
+            start = time.perf_counter()
+            try:
+                connection = connect()
+            except PoolTimeoutError:
+                stats.record_timeout(time.perf_counter() - start)
+                raise
+            stats.record_checkout(time.perf_counter() - start)
+            return connection
+
+        pool.connect = timed_connect
+
+    wrap(engine.pool)
+    event.listen(engine, "engine_disposed", lambda engine: wrap(engine.pool))
+
+
+def _is_sqlite_file(database_url: str) -> bool:
+    """Whether the URL points at an on-disk SQLite database."""
+    url = make_url(database_url)
+    return (
+        url.get_backend_name() == "sqlite"
+        and url.database not in (None, "", ":memory:")
+        and url.query.get("mode") != "memory"
+    )
+
+
+def _apply_sqlite_pragmas(engine, settings: Settings):
+    """Tune every new SQLite connection for concurrent readers and a writer."""
+    pragmas = [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _engine_options(database_url: str, settings: Settings) -> Dict[str, Any]:
+    """Build pool keyword arguments for ``create_engine``."""
+    url = make_url(database_url)
+    options: Dict[str, Any] = {
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+
+    # Sizing only applies to queue pools; in-memory SQLite uses a
+    # singleton/static pool that has no overflow or timeout.
+    pool_class = url.get_dialect().get_pool_class(url)
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+        )
+
+    # Pooled SQLite connections are handed between FastAPI's worker threads
+    if url.get_backend_name() == "sqlite" and url.get_driver_name() == "pysqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+class _DatabaseNode:
+    """Engines and session factories for a single database server."""
+
+    def __init__(
+        self,
+        database_url: str,
+        async_database_url: str,
+        settings: Settings,
+        retry_seconds: float = 30.0,
+    ):
+        self.database_url = database_url
+        self.async_database_url = async_database_url
+        self.settings = settings
+        self.retry_seconds = retry_seconds
+        self.unhealthy_until = 0.0
+        self.pool_stats = PoolStats()
+        self.async_pool_stats = PoolStats()
 
-    def __init__(self, database_url: str = None):
-        """Initialize database manager."""
-        self.database_url = database_url or get_settings().database_url
         self.engine = create_engine(
             self.database_url,
-            echo=get_settings().api_debug
+            echo=settings.api_debug,
+            **_engine_options(self.database_url, settings)
         )
+        _time_pool_checkouts(self.engine, self.pool_stats)
         self.SessionLocal = sessionmaker(
             autocommit=False,
             autoflush=False,
             bind=self.engine
         )
+        event.listen(self.engine, "handle_error", self._on_error)
+        if settings.sqlite_high_throughput and _is_sqlite_file(self.database_url):
+            _apply_sqlite_pragmas(self.engine, settings)
+        if settings.database_query_stats_enabled:
+            instrument_engine(self.engine, settings.database_slow_query_ms)
+
+        # The async engine is only built when first used, so sync-only
+        # consumers (CLI, worker) never need an async driver installed.
+        self._async_engine: Optional[AsyncEngine] = None
+        self._async_session_factory: Optional[async_sessionmaker] = None
+
+    @property
+    def name(self) -> str:
+        """Database URL with the password masked."""
+        return make_url(self.database_url).render_as_string(hide_password=True)
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """Get the async engine, creating it on first use."""
+        if self._async_engine is None:
+            self._async_engine = create_async_engine(
+                self.async_database_url,
+                echo=self.settings.api_debug,
+                **_engine_options(self.async_database_url, self.settings)
+            )
+            _time_pool_checkouts(self._async_engine.sync_engine, self.async_pool_stats)
+            event.listen(self._async_engine.sync_engine, "handle_error", self._on_error)
+            if self.settings.sqlite_high_throughput and _is_sqlite_file(
+                self.async_database_url
+            ):
+                _apply_sqlite_pragmas(self._async_engine.sync_engine, self.settings)
+            if self.settings.database_query_stats_enabled:
+                instrument_engine(
+                    self._async_engine.sync_engine, self.settings.database_slow_query_ms
+                )
+        return self._async_engine
+
+    @property
+    def AsyncSessionLocal(self) -> async_sessionmaker:
+        """Get the async session factory, creating it on first use."""
+        if self._async_session_factory is None:
+            self._async_session_factory = async_sessionmaker(
+                bind=self.async_engine,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+        return self._async_session_factory
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the node may currently receive traffic."""
+        return time.monotonic() >= self.unhealthy_until
+
+    def mark_unhealthy(self):
+        """Take the node out of rotation for ``retry_seconds``."""
+        self.unhealthy_until = time.monotonic() + self.retry_seconds
+
+    def mark_healthy(self):
+        """Put the node back into rotation."""
+        self.unhealthy_until = 0.0
+
+    def ping(self) -> bool:
+        """Run a trivial query and update the health state."""
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except SQLAlchemyError:
+            self.mark_unhealthy()
+            return False
+        self.mark_healthy()
+        return True
+
+    def saturated(self, use_async: bool = False) -> bool:
+        """Whether every connection the pool may open is checked out."""
+        if use_async and self._async_engine is None:
+            return False
+        engine = self._async_engine.sync_engine if use_async else self.engine
+        pool = engine.pool
+        max_overflow = self.settings.database_max_overflow
+        if not isinstance(pool, QueuePool) or max_overflow < 0:
+            return False
+        return pool.checkedout() >= pool.size() + max_overflow
+
+    def admit_checkout(self, use_async: bool):
+        """Refuse a checkout up front when the pool is exhausted.
+
+        Waiting for ``pool_timeout`` under a burst ties up every route;
+        failing fast lets callers back off and retry instead.
+        """
+        if self.saturated(use_async):
+            stats = self.async_pool_stats if use_async else self.pool_stats
+            stats.record_rejection()
+            raise DatabaseBusyError(self.settings.api_busy_retry_after_seconds)
+
+    def pool_status(self) -> Dict[str, Any]:
+        """Live pool occupancy and checkout counters for each engine."""
+        engines = {"sync": (self.engine, self.pool_stats)}
+        if self._async_engine is not None:
+            engines["async"] = (self._async_engine.sync_engine, self.async_pool_stats)
+
+        status = {}
+        for kind, (engine, stats) in engines.items():
+            pool = engine.pool
+            status[kind] = {"pool_class": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                status[kind].update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    overflow=pool.overflow(),
+                )
+            status[kind].update(stats.snapshot())
+        return status
+
+    def _on_error(self, context):
+        """Mark the node unhealthy on connect failures and disconnects."""
+        if context.connection is None or context.is_disconnect:
+            self.mark_unhealthy()
+
+    async def dispose(self):
+        """Release all pooled connections held by the engines."""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+        self.engine.dispose()
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _admit_request_checkout(session: Session, transaction):
+    """Check a request session's pool right before it takes a connection.
+
+    Admitting at checkout rather than when the session opens means
+    requests answered without the database (e.g. from the cache) never
+    count against the pool, and nothing is awaited between the check and
+    the checkout it guards.
+    """
+    admit = session.info.get("admit_checkout")
+    if admit is not None and transaction.parent is None:
+        admit()
+
+
+class DatabaseManager:
+    """Database connection and session management."""
+
+    def __init__(
+        self,
+        database_url: str = None,
+        async_database_url: Optional[str] = None,
+        replica_urls: Optional[List[str]] = None,
+    ):
+        """Initialize database manager."""
+        settings = get_settings()
+        self.database_url = database_url or settings.database_url
+        self.async_database_url = (
+            async_database_url
+            or (None if database_url else settings.async_database_url)
+            or to_async_url(self.database_url)
+        )
+        if replica_urls is None:
+            replica_urls = [] if database_url else settings.database_replica_urls
+
+        self._primary = _DatabaseNode(
+            self.database_url,
+            self.async_database_url,
+            settings,
+        )
+        self.engine = self._primary.engine
+        self.SessionLocal = self._primary.SessionLocal
+
+        self.replicas = [
+            _DatabaseNode(
+                url,
+                to_async_url(url),
+                settings,
+                retry_seconds=settings.database_replica_retry_seconds,
+            )
+            for url in replica_urls
+        ]
+        self._replica_counter = itertools.count()
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """Get the primary async engine, creating it on first use."""
+        return self._primary.async_engine
+
+    @property
+    def AsyncSessionLocal(self) -> async_sessionmaker:
+        """Get the primary async session factory."""
+        return self._primary.AsyncSessionLocal
+
+    def _read_node(self) -> _DatabaseNode:
+        """Pick the next healthy replica, falling back to the primary."""
+        count = len(self.replicas)
+        start = next(self._replica_counter)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if replica.healthy:
+                return replica
+        return self._primary
+
+    def check_replicas(self) -> Dict[str, bool]:
+        """Ping every replica and return its health by (masked) URL."""
+        return {replica.name: replica.ping() for replica in self.replicas}
+
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Live connection pool statistics for the primary and each replica."""
+        stats = {"primary": self._primary.pool_status()}
+        for replica in self.replicas:
+            stats[replica.name] = replica.pool_status()
+        return stats
 
     def create_tables(self):
         """Create all tables."""
@@ -40,8 +441,20 @@ class DatabaseManager:
         Base.metadata.drop_all(bind=self.engine)
 
     @contextmanager
-    def get_session(self) -> Generator[Session, None, None]:
-        """Get database session with automatic cleanup."""
+    def get_session(self, readonly: bool = False) -> Generator[Session, None, None]:
+        """Get database session with automatic cleanup.
+
+        Read-only sessions are routed to a healthy replica when one is
+        configured and are never committed.
+        """
+        if readonly:
+            session = self._read_node().SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+            return
+
         session = self.SessionLocal()
         try:
             yield session
@@ -52,14 +465,92 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def _request_session(self, node: _DatabaseNode, use_async: bool):
+        session = node.AsyncSessionLocal() if use_async else node.SessionLocal()
+        if node.settings.database_pool_fail_fast:
+            session.info["admit_checkout"] = functools.partial(node.admit_checkout, use_async)
+        return session
+
+    @contextmanager
+    def request_session(self, readonly: bool = False) -> Generator[Session, None, None]:
+        """Session scoped to one request, always closed on exit.
+
+        Raises ``DatabaseBusyError`` instead of queueing when it needs a
+        connection while the pool is exhausted. Callers commit explicitly.
+        """
+        node = self._read_node() if readonly else self._primary
+        session = self._request_session(node, use_async=False)
+        try:
+            yield session
+        finally:
+            session.close()
+
+    @asynccontextmanager
+    async def async_request_session(
+        self, readonly: bool = False
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """Async session scoped to one request, always closed on exit.
+
+        Raises ``DatabaseBusyError`` instead of queueing when it needs a
+        connection while the pool is exhausted. Callers commit explicitly.
+        """
+        node = self._read_node() if readonly else self._primary
+        session = self._request_session(node, use_async=True)
+        try:
+            yield session
+        finally:
+            await session.close()
+
     def get_session_dependency(self) -> Generator[Session, None, None]:
         """Dependency for FastAPI to get database session."""
-        session = self.SessionLocal()
+        with self.request_session() as session:
+            yield session
+
+    def get_readonly_session_dependency(self) -> Generator[Session, None, None]:
+        """Dependency for FastAPI to get a read-only database session."""
+        with self.request_session(readonly=True) as session:
+            yield session
+
+    @asynccontextmanager
+    async def async_session(
+        self, readonly: bool = False
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """Get async database session with automatic cleanup."""
+        if readonly:
+            session = self._read_node().AsyncSessionLocal()
+            try:
+                yield session
+            finally:
+                await session.close()
+            return
+
+        session = self.AsyncSessionLocal()
         try:
             yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
         finally:
-            session.close()
+            await session.close()
+
+    async def get_async_session_dependency(self) -> AsyncGenerator[AsyncSession, None]:
+        """Dependency for FastAPI to get async database session."""
+        async with self.async_request_session() as session:
+            yield session
+
+    async def get_async_readonly_session_dependency(
+        self,
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """Dependency for FastAPI to get a read-only async database session."""
+        async with self.async_request_session(readonly=True) as session:
+            yield session
+
+    async def dispose(self):
+        """Release all pooled connections held by the engines."""
+        for node in [self._primary, *self.replicas]:
+            await node.dispose()
 
 
-# Global database manager instance
-db_manager = DatabaseManager()
\ No newline at end of file
+# Global database manager instance, built on first use
+db_manager = cast(DatabaseManager, LazyProxy(DatabaseManager))
@@ -0,0 +1,54 @@
+"""
+Lazily constructed module-level singletons.
+"""
+
+import threading
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+_UNSET = object()
+
+
+class LazyProxy(Generic[T]):
+    """Stand-in for a module-level singleton that is built on first use.
+
+    Attribute access, assignment and deletion are forwarded to the object
+    returned by ``factory``, which is called at most once, on first use.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        """Initialize the proxy without calling ``factory``."""
+        object.__setattr__(self, "_lazy_factory", factory)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+        object.__setattr__(self, "_lazy_instance", _UNSET)
+
+    def _lazy_get(self) -> T:
+        """Get the wrapped object, building it if needed."""
+        instance = object.__getattribute__(self, "_lazy_instance")
+        if instance is _UNSET:
+            with object.__getattribute__(self, "_lazy_lock"):
+                instance = object.__getattribute__(self, "_lazy_instance")
+                if instance is _UNSET:
+                    instance = object.__getattribute__(self, "_lazy_factory")()
+                    object.__setattr__(self, "_lazy_instance", instance)
+        return instance
+
+    def _lazy_is_built(self) -> bool:
+        """Whether the wrapped object has been built yet."""
+        return object.__getattribute__(self, "_lazy_instance") is not _UNSET
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._lazy_get(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._lazy_get(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._lazy_get(), name)
+
+    def __repr__(self) -> str:
+        if not self._lazy_is_built():
+            factory = object.__getattribute__(self, "_lazy_factory")
+            return f"<LazyProxy for {getattr(factory, '__qualname__', factory)!r} (not built)>"
+        return repr(self._lazy_get())
@@ -0,0 +1,211 @@
+"""
+Minimal in-process metrics registry with Prometheus text exposition.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# A collected family: (name, type, help, samples). Samples are
+# (labels, value) or (labels, value, name_suffix) tuples.
+MetricFamily = Tuple[str, str, str, List[tuple]]
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, labelvalues: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, labelvalues))
+
+    def collect(self) -> MetricFamily:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, labelvalues: LabelValues = (), amount: float = 1.0):
+        """Increase the counter for a label set."""
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, labelvalues: LabelValues = ()) -> float:
+        """Current value for a label set."""
+        return self._values.get(labelvalues, 0.0)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            samples = [(self._labels(k), v) for k, v in self._values.items()]
+        return self.name, self.type_name, self.documentation, samples
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    type_name = "gauge"
+
+    def dec(self, labelvalues: LabelValues = (), amount: float = 1.0):
+        """Decrease the gauge for a label set."""
+        self.inc(labelvalues, -amount)
+
+    def set(self, value: float, labelvalues: LabelValues = ()):
+        """Set the gauge for a label set."""
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, labelvalues: LabelValues = ()):
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, labelvalues: LabelValues = ()) -> int:
+        """Number of observations for a label set."""
+        state = self._values.get(labelvalues)
+        return state[2] if state else 0
+
+    def collect(self) -> MetricFamily:
+        samples = []
+        with self._lock:
+            values = [(k, list(v[0]), v[1], v[2]) for k, v in self._values.items()]
+        for labelvalues, counts, total, count in values:
+            labels = self._labels(labelvalues)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append(
+                    ({**labels, "le": _format_value(bound)}, cumulative, "_bucket")
+                )
+            samples.append((labels, total, "_sum"))
+            samples.append((labels, count, "_count"))
+        return self.name, self.type_name, self.documentation, samples
+
+
+class MetricsRegistry:
+    """Holds metrics and pull-time collectors and renders them."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[MetricFamily]]] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.type_name}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames, buckets or DEFAULT_BUCKETS
+        )
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[MetricFamily]]):
+        """Register (or replace) a callable producing metric families at scrape time."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, type_name, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {type_name}")
+            for sample in samples:
+                labels, value = sample[0], sample[1]
+                suffix = sample[2] if len(sample) > 2 else ""
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
@@ -0,0 +1,177 @@
+"""
+Online data migrations that run in small batches alongside live traffic.
+
+There is no migration framework in the monorepo yet: ``create_tables``
+builds new databases from the models, and existing databases are brought
+up to date with the functions below, which are safe to re-run.
+"""
+
+import time
+from typing import Dict
+
+from sqlalchemy import (
+    Boolean,
+    String,
+    case,
+    column,
+    false,
+    func,
+    inspect,
+    select,
+    table,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from .models import User
+from .utils import logger
+
+# Text values the old String(10) column treated as active
+LEGACY_ACTIVE_VALUES = ("true", "1", "t", "yes", "y", "on")
+
+_USERS = User.__tablename__
+_STAGING_COLUMN = "is_active_new"
+_LEGACY_COLUMN = "is_active_legacy"
+
+
+def _user_columns(engine: Engine) -> Dict[str, object]:
+    return {
+        col["name"]: col["type"] for col in inspect(engine).get_columns(_USERS)
+    }
+
+
+def _backfill_statement(lower_id: int, upper_id: int):
+    users = table(
+        _USERS,
+        column("id"),
+        column("is_active", String),
+        column(_STAGING_COLUMN, Boolean),
+    )
+    flag = func.lower(func.trim(users.c.is_active))
+    return (
+        update(users)
+        .where(
+            users.c.id > lower_id,
+            users.c.id <= upper_id,
+            users.c[_STAGING_COLUMN].is_(None),
+        )
+        .values(
+            {_STAGING_COLUMN: case((flag.in_(LEGACY_ACTIVE_VALUES), true()), else_=false())}
+        )
+    )
+
+
+def _swap_sqlite(conn, keep_legacy: bool):
+    """Swap the columns on SQLite, which cannot relax a NOT NULL constraint.
+
+    A renamed legacy column would stay NOT NULL with no default, failing
+    every insert that does not know about it, so the text column is dropped
+    instead, after copying it to a nullable legacy column when kept.
+    """
+    if keep_legacy:
+        conn.execute(text(f"ALTER TABLE {_USERS} ADD COLUMN {_LEGACY_COLUMN} VARCHAR(10)"))
+        conn.execute(text(f"UPDATE {_USERS} SET {_LEGACY_COLUMN} = is_active"))
+    conn.execute(text(f"ALTER TABLE {_USERS} DROP COLUMN is_active"))
+    conn.execute(text(f"ALTER TABLE {_USERS} RENAME COLUMN {_STAGING_COLUMN} TO is_active"))
+
+
+def create_active_user_indexes(engine: Engine):
+    """Create the partial indexes on active users if they are missing.
+
+    On PostgreSQL they are built ``CONCURRENTLY`` so writes continue while
+    the index builds.
+    """
+    for index in User.__table__.indexes:
+        if not index.name.startswith("ix_users_active"):
+            continue
+        if engine.dialect.name == "postgresql":
+            ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+            ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text(ddl))
+        else:
+            index.create(engine, checkfirst=True)
+
+
+def migrate_is_active_to_boolean(
+    engine: Engine,
+    batch_size: int = 1000,
+    pause_seconds: float = 0.0,
+    drop_legacy: bool = True,
+) -> Dict[str, int]:
+    """Convert ``users.is_active`` from text flags to a boolean column.
+
+    The table is never locked as a whole: a nullable boolean column is
+    added (a catalog-only change), filled in id ranges of ``batch_size``
+    rows with one short transaction per range, and then swapped in by
+    renaming both columns in a final transaction that only converts rows
+    written since the backfill. An interrupted run resumes where it left
+    off. On PostgreSQL the new column then gets its ``NOT NULL`` and
+    default through a validated check constraint, avoiding a locked
+    table scan. SQLite cannot alter column constraints, so there the
+    model supplies the default and the old column is dropped (or copied
+    to a nullable ``is_active_legacy``) in the swap transaction.
+    """
+    columns = _user_columns(engine)
+    stats = {"batches": 0, "rows": 0, "swapped": 0}
+
+    if isinstance(columns["is_active"], String):
+        if _STAGING_COLUMN not in columns:
+            column_type = Boolean().compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(
+                    text(f"ALTER TABLE {_USERS} ADD COLUMN {_STAGING_COLUMN} {column_type}")
+                )
+
+        with engine.connect() as conn:
+            max_id = conn.scalar(select(func.max(User.id))) or 0
+
+        for lower_id in range(0, max_id, batch_size):
+            with engine.begin() as conn:
+                result = conn.execute(_backfill_statement(lower_id, lower_id + batch_size))
+            stats["batches"] += 1
+            stats["rows"] += result.rowcount
+            if pause_seconds:
+                time.sleep(pause_seconds)
+        logger.info(
+            "Backfilled %d users in %d batches", stats["rows"], stats["batches"]
+        )
+
+        with engine.begin() as conn:
+            # Rows inserted while the backfill ran
+            result = conn.execute(_backfill_statement(0, 2**62))
+            stats["rows"] += result.rowcount
+            if engine.dialect.name == "sqlite":
+                _swap_sqlite(conn, keep_legacy=not drop_legacy)
+            else:
+                conn.execute(text(f"ALTER TABLE {_USERS} RENAME COLUMN is_active TO {_LEGACY_COLUMN}"))
+                conn.execute(text(f"ALTER TABLE {_USERS} RENAME COLUMN {_STAGING_COLUMN} TO is_active"))
+            if engine.dialect.name == "postgresql":
+                conn.execute(text(f"ALTER TABLE {_USERS} ALTER COLUMN is_active SET DEFAULT true"))
+                # New rows must not need the legacy column
+                conn.execute(text(f"ALTER TABLE {_USERS} ALTER COLUMN {_LEGACY_COLUMN} DROP NOT NULL"))
+        stats["swapped"] = 1
+        logger.info("Swapped in boolean users.is_active")
+
+        if engine.dialect.name == "postgresql":
+            constraint = "users_is_active_not_null"
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {_USERS} ADD CONSTRAINT {constraint} "
+                    f"CHECK (is_active IS NOT NULL) NOT VALID"
+                ))
+            with engine.begin() as conn:
+                # Scans without blocking writes; SET NOT NULL then reuses the proof
+                conn.execute(text(f"ALTER TABLE {_USERS} VALIDATE CONSTRAINT {constraint}"))
+                conn.execute(text(f"ALTER TABLE {_USERS} ALTER COLUMN is_active SET NOT NULL"))
+                conn.execute(text(f"ALTER TABLE {_USERS} DROP CONSTRAINT {constraint}"))
+
+    if drop_legacy and _LEGACY_COLUMN in _user_columns(engine):
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {_USERS} DROP COLUMN {_LEGACY_COLUMN}"))
+
+    create_active_user_indexes(engine)
+    return stats
@@ -3,11 +3,11 @@ Base models and common database models.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, List, Literal, Optional
 
-from pydantic import BaseModel as PydanticBaseModel
-from sqlalchemy import Column, Integer, DateTime, String
-from sqlalchemy.sql import func
+from pydantic import BaseModel as PydanticBaseModel, field_validator
+from sqlalchemy import DDL, Boolean, Column, Integer, DateTime, Index, String, event
+from sqlalchemy.sql import expression, func
 
 from .database import Base
 
@@ -54,7 +54,97 @@ class User(BaseDBModel):
     email = Column(String(255), unique=True, index=True, nullable=False)
     username = Column(String(100), unique=True, index=True, nullable=False)
     full_name = Column(String(255), nullable=True)
-    is_active = Column(String(10), default="true", nullable=False)
+    is_active = Column(
+        Boolean,
+        default=True,
+        server_default=expression.true(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # Supports keyset pagination ordered by creation time
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Partial indexes covering only active rows, for ?active=true pages
+        # (backends without partial indexes get a full index). SQLite only
+        # matches a predicate written exactly as queries render it.
+        Index(
+            "ix_users_active_id",
+            "id",
+            postgresql_where=is_active,
+            sqlite_where=is_active == expression.true(),
+        ),
+        Index(
+            "ix_users_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=is_active,
+            sqlite_where=is_active == expression.true(),
+        ),
+    )
+
+
+# Text search over username, email and full_name. SQLite keeps an external
+# content FTS5 table (trigram tokenizer, so any 3+ character substring
+# matches) in sync with triggers; PostgreSQL uses one trigram GIN index
+# over the same expression the search query filters on.
+USER_SEARCH_EXPRESSION = "lower(username || ' ' || email || ' ' || coalesce(full_name, ''))"
+
+# FTS5's trigram tokenizer first shipped in SQLite 3.34.0
+SQLITE_TRIGRAM_MIN_VERSION = (3, 34, 0)
+
+
+def sqlite_supports_search(connection) -> bool:
+    """Whether a SQLite connection has FTS5 with the trigram tokenizer."""
+    version = connection.exec_driver_sql("SELECT sqlite_version()").scalar()
+    if tuple(int(part) for part in version.split(".")) < SQLITE_TRIGRAM_MIN_VERSION:
+        return False
+    return bool(
+        connection.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar()
+    )
+
+
+def _search_ddl_supported(ddl, target, bind, **kw) -> bool:
+    # Without a connection (e.g. rendering DDL to a script) emit everything
+    return bind is None or bind.dialect.name != "sqlite" or sqlite_supports_search(bind)
+
+
+USER_SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+        "username, email, full_name, content='users', content_rowid='id', "
+        "tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN "
+        "INSERT INTO users_fts(rowid, username, email, full_name) "
+        "VALUES (new.id, new.username, new.email, new.full_name); END",
+        "CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, username, email, full_name) "
+        "VALUES ('delete', old.id, old.username, old.email, old.full_name); END",
+        "CREATE TRIGGER IF NOT EXISTS users_fts_update "
+        "AFTER UPDATE OF username, email, full_name ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, username, email, full_name) "
+        "VALUES ('delete', old.id, old.username, old.email, old.full_name); "
+        "INSERT INTO users_fts(rowid, username, email, full_name) "
+        "VALUES (new.id, new.username, new.email, new.full_name); END",
+    ],
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users "
+        f"USING gin (({USER_SEARCH_EXPRESSION}) gin_trgm_ops)",
+    ],
+}
+
+for _dialect, _statements in USER_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            User.__table__,
+            "after_create",
+            DDL(_statement).execute_if(dialect=_dialect, callable_=_search_ddl_supported),
+        )
+event.listen(
+    User.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS users_fts").execute_if(dialect="sqlite"),
+)
 
 
 # Pydantic schemas
@@ -70,9 +160,40 @@ class UserCreate(UserBase):
     pass
 
 
+class UserUpdate(BaseModel):
+    """Partial user update schema; only fields sent are changed."""
+    email: Optional[str] = None
+    username: Optional[str] = None
+    full_name: Optional[str] = None
+    is_active: Optional[bool] = None
+
+    @field_validator("email", "username", "is_active")
+    @classmethod
+    def not_null(cls, value: Any) -> Any:
+        """Reject explicit nulls for required columns."""
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
 class UserResponse(UserBase):
     """User response schema."""
     id: int
-    is_active: str
+    is_active: bool
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+
+
+class BulkUserResult(BaseModel):
+    """Outcome of a single row in a bulk user import."""
+    index: int
+    status: Literal["created", "duplicate", "invalid"]
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkUserResponse(BaseModel):
+    """Bulk user import response schema."""
+    created: int
+    failed: int
+    results: List[BulkUserResult]
@@ -0,0 +1,31 @@
+"""
+Opaque cursors for keyset pagination.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    payload = json.dumps(position, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by ``encode_cursor``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+    if not isinstance(position, dict):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return position
@@ -0,0 +1,145 @@
+"""
+SQL query instrumentation: per-request/task query counts and a slow-query log.
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Generator, Optional, Tuple
+
+from sqlalchemy import event
+
+from .metrics import metrics
+from .utils import logger
+
+# Longest statement text written to the slow-query log
+MAX_LOGGED_STATEMENT = 1000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """Statements executed within one unit of work (a request or a task)."""
+
+    __slots__ = ("tag", "count", "total_seconds", "slow")
+
+    def __init__(self, tag: str = ""):
+        self.tag = tag
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slow = 0
+
+    def record(self, duration: float, slow: bool = False):
+        """Account for one executed statement."""
+        self.count += 1
+        self.total_seconds += duration
+        if slow:
+            self.slow += 1
+
+    @property
+    def total_ms(self) -> float:
+        """Total database time in milliseconds."""
+        return self.total_seconds * 1000
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats for the unit of work running in this context, if any."""
+    return _current_stats.get()
+
+
+def start_query_stats(tag: str = "") -> Tuple[QueryStats, Token]:
+    """Attribute statements executed in this context to a new ``QueryStats``.
+
+    Pass the returned token to ``stop_query_stats`` when the unit of work ends.
+    """
+    stats = QueryStats(tag)
+    return stats, _current_stats.set(stats)
+
+
+def stop_query_stats(token: Token):
+    """Restore the stats that were current before ``start_query_stats``."""
+    _current_stats.reset(token)
+
+
+@contextmanager
+def track_queries(tag: str = "") -> Generator[QueryStats, None, None]:
+    """Attribute every statement executed in this block to a new ``QueryStats``.
+
+    Context variables are copied into threadpool workers and SQLAlchemy's
+    async greenlets, so statements run from either are counted as well.
+    """
+    stats, token = start_query_stats(tag)
+    try:
+        yield stats
+    finally:
+        stop_query_stats(token)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace bound parameter values with their type names."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: describe the first row only
+            return [redact_parameters(parameters[0]), f"... {len(parameters)} rows"]
+        return tuple(type(value).__name__ for value in parameters)
+    return type(parameters).__name__
+
+
+def _format_statement(statement: str) -> str:
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    if len(statement) > MAX_LOGGED_STATEMENT:
+        statement = statement[:MAX_LOGGED_STATEMENT] + "..."
+    return statement
+
+
+def instrument_engine(engine, slow_query_ms: float):
+    """Time every statement on ``engine`` and log the slow ones.
+
+    Parameter values are never logged, only their types, so the slow-query
+    log is safe to ship to shared log storage.
+    """
+    slow_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else None
+    queries = metrics.counter("db_queries_total", "SQL statements executed")
+    slow_queries = metrics.counter(
+        "db_slow_queries_total", "SQL statements slower than the slow-query threshold"
+    )
+    latency = metrics.histogram(
+        "db_query_duration_seconds", "SQL statement execution time in seconds"
+    )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_start", None)
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        slow = slow_seconds is not None and duration >= slow_seconds
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(duration, slow)
+        queries.inc()
+        latency.observe(duration)
+
+        if slow:
+            slow_queries.inc()
+            logger.warning(
+                "Slow query (%.1f ms) [%s]: %s params=%s",
+                duration * 1000,
+                stats.tag if stats is not None else "-",
+                _format_statement(statement),
+                redact_parameters(parameters),
+            )
@@ -0,0 +1,152 @@
+"""
+Indexed user search: SQLite FTS5 or PostgreSQL trigram matching.
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import Float, Integer, String, bindparam, func, literal_column, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+
+from .models import USER_SEARCH_DDL, USER_SEARCH_EXPRESSION, User, sqlite_supports_search
+from .utils import logger
+
+# Trigram indexes cannot answer substrings shorter than this
+SEARCH_MIN_TERM_LENGTH = 3
+
+# bm25 weights for the FTS5 columns: username, email, full_name
+_FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a search string into lowercase terms long enough to index."""
+    return [
+        term
+        for term in query.lower().split()
+        if len(term) >= SEARCH_MIN_TERM_LENGTH
+    ]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Whether each database (by URL, whatever the driver) has the search index
+_search_indexed: Dict[str, bool] = {}
+
+
+def _database_key(engine: Engine) -> str:
+    url = engine.url
+    return url.set(drivername=url.get_backend_name()).render_as_string(hide_password=True)
+
+
+def _check_search_indexed(connection) -> bool:
+    if connection.dialect.name == "sqlite":
+        return bool(connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+        ).scalar())
+    if connection.dialect.name == "postgresql":
+        return bool(connection.exec_driver_sql(
+            "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+        ).scalar())
+    return False
+
+
+def user_search_indexed(connection) -> bool:
+    """Whether the database has what ``user_search_query`` needs for indexed search.
+
+    SQLite builds without FTS5 trigram support (or databases that predate
+    the index) lack ``users_fts``; PostgreSQL needs the pg_trgm extension.
+    Looked up once per database and process; ``install_user_search``
+    refreshes it.
+    """
+    key = _database_key(connection.engine)
+    indexed = _search_indexed.get(key)
+    if indexed is None:
+        indexed = _search_indexed[key] = _check_search_indexed(connection)
+    return indexed
+
+
+def user_search_query(dialect_name: str, terms: List[str], indexed: bool = True) -> Select:
+    """Select users matching every term, best matches first.
+
+    Terms match anywhere in the username, email or full name. Without a
+    search index (``indexed`` false, or another backend) this falls back to
+    an unindexed ``LIKE`` scan.
+    """
+    if indexed and dialect_name == "sqlite":
+        # Quoted phrases are substring matches under the trigram tokenizer
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        fts = text(
+            "SELECT rowid AS id, bm25(users_fts, :w_username, :w_email, :w_full_name) AS rank "
+            "FROM users_fts WHERE users_fts MATCH :match"
+        ).bindparams(
+            match=match,
+            w_username=_FTS_WEIGHTS[0],
+            w_email=_FTS_WEIGHTS[1],
+            w_full_name=_FTS_WEIGHTS[2],
+        ).columns(id=Integer, rank=Float).subquery("fts")
+        return (
+            select(User)
+            .join(fts, fts.c.id == User.id)
+            # bm25 is lower for better matches
+            .order_by(fts.c.rank, User.id)
+        )
+
+    if indexed and dialect_name == "postgresql":
+        # Spelled exactly like the ix_users_search_trgm expression
+        document = literal_column(USER_SEARCH_EXPRESSION, String)
+        return (
+            select(User)
+            .where(
+                *(
+                    document.like(bindparam(f"term_{i}", f"%{_escape_like(term)}%"), escape="\\")
+                    for i, term in enumerate(terms)
+                )
+            )
+            .order_by(func.word_similarity(" ".join(terms), document).desc(), User.id)
+        )
+
+    def contains(term: str):
+        pattern = f"%{_escape_like(term)}%"
+        return or_(
+            *(
+                func.lower(column).like(pattern, escape="\\")
+                for column in (User.username, User.email, User.full_name)
+            )
+        )
+
+    return select(User).where(*(contains(term) for term in terms)).order_by(User.id)
+
+
+def install_user_search(engine: Engine) -> bool:
+    """Create the search index on an existing database and fill it.
+
+    New databases get it from ``create_tables``. Safe to re-run. Returns
+    False when the backend cannot index search, which then scans instead.
+    """
+    installed = _install_user_search(engine)
+    _search_indexed[_database_key(engine)] = installed
+    return installed
+
+
+def _install_user_search(engine: Engine) -> bool:
+    statements = USER_SEARCH_DDL.get(engine.dialect.name)
+    if not statements:
+        return False
+
+    if engine.dialect.name == "postgresql":
+        # Build the index without blocking writes
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in statements:
+                conn.execute(text(statement.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+        return True
+
+    with engine.begin() as conn:
+        if not sqlite_supports_search(conn):
+            logger.warning("SQLite lacks FTS5 trigram support; user search will scan")
+            return False
+        for statement in statements:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+    return True
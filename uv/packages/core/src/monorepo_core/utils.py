@@ -2,52 +2,288 @@
 Common utility functions and helpers.
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import re
 import sys
-from typing import Any, Dict, Optional
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, cast
 
 from .config import get_settings
+from .lazy import LazyProxy
+from .metrics import MetricFamily, metrics
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None))
+) | {"message", "asctime", "taskName"}
+
+_EXC_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one compact JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "src": f"{record.filename}:{record.lineno}",
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, separators=(",", ":"), default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N records below ``WARNING`` per logger and message template.
+
+    Records are grouped by their unformatted template (``"Created user: %s"``),
+    and the first of each group is always kept. ``rates`` overrides the rate
+    by template or logger name. Every ``summary_seconds`` an INFO record
+    reports how many similar messages were suppressed for each template.
+    """
+
+    def __init__(
+        self,
+        rate: int = 10,
+        rates: Optional[Dict[str, int]] = None,
+        summary_seconds: float = 60.0,
+        max_templates: int = 10000,
+    ):
+        """Initialize filter."""
+        super().__init__()
+        self.rate = rate
+        self.rates = rates or {}
+        self.summary_seconds = summary_seconds
+        self.max_templates = max_templates
+        self._seen: Dict[Tuple[str, str], int] = {}
+        self._suppressed: Dict[Tuple[str, str], int] = {}
+        self._next_summary = time.monotonic() + summary_seconds
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or hasattr(record, "suppressed"):
+            keep = True
+        else:
+            template = str(record.msg)
+            key = (record.name, template)
+            rate = self.rates.get(template, self.rates.get(record.name, self.rate))
+            with self._lock:
+                if key not in self._seen and len(self._seen) >= self.max_templates:
+                    self._seen.clear()
+                count = self._seen.get(key, 0)
+                self._seen[key] = count + 1
+                keep = rate <= 1 or count % rate == 0
+                if not keep:
+                    self._suppressed[key] = self._suppressed.get(key, 0) + 1
+
+        if time.monotonic() >= self._next_summary:
+            self.summarize()
+        return keep
+
+    def summarize(self):
+        """Log how many records were suppressed per template since the last summary."""
+        with self._lock:
+            self._next_summary = time.monotonic() + self.summary_seconds
+            suppressed, self._suppressed = self._suppressed, {}
+
+        for (name, template), count in suppressed.items():
+            logger = logging.getLogger(name)
+            logger.handle(
+                logger.makeRecord(
+                    name, logging.INFO, __file__, 0,
+                    "Suppressed %d similar messages: %r", (count, template), None,
+                    extra={"suppressed": count},
+                )
+            )
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks the caller.
+
+    When the queue is full the record is dropped and counted per level;
+    once there is room again a warning reports how many were lost.
+    """
+
+    def __init__(self, maxsize: int):
+        """Initialize handler with a bounded queue."""
+        super().__init__(queue.Queue(maxsize))
+        self.dropped: Dict[str, int] = {}
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render tracebacks while they are still valid in the
+        # caller; timestamp/JSON formatting and the write happen in the listener.
+        # The record is updated in place: later handlers see the same text.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self._unreported:
+                self.queue.put_nowait(
+                    logging.LogRecord(
+                        record.name, logging.WARNING, __file__, 0,
+                        "Dropped %d log records: logging queue full",
+                        (self._unreported,), None,
+                    )
+                )
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+            self._unreported += 1
+
+
+# Queue handler and background listener per configured logger name
+_log_queues: Dict[str, Tuple[DroppingQueueHandler, logging.handlers.QueueListener]] = {}
+
+
+def _stop_log_listeners():
+    """Flush queued records and stop every background listener."""
+    for _, listener in _log_queues.values():
+        listener.stop()
+    _log_queues.clear()
+
+
+atexit.register(_stop_log_listeners)
+
+
+def _restart_log_listeners():
+    """Give a forked child process its own queues and listener threads.
+
+    Threads do not survive ``fork`` (e.g. Celery's prefork pool), so the
+    child's records would otherwise pile up with nothing writing them.
+    Records the parent had queued are left for the parent to write.
+    """
+    for name, (handler, listener) in list(_log_queues.items()):
+        handler.queue = queue.Queue(handler.queue.maxsize)
+        handler.dropped = {}
+        handler._unreported = 0
+        child_listener = logging.handlers.QueueListener(
+            handler.queue,
+            *listener.handlers,
+            respect_handler_level=listener.respect_handler_level,
+        )
+        child_listener.start()
+        _log_queues[name] = (handler, child_listener)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_log_listeners)
+
+
+def collect_logging_metrics() -> Iterable[MetricFamily]:
+    """Log queue depth and dropped record counters."""
+    depth, dropped = [], []
+    for name, (handler, _) in list(_log_queues.items()):
+        depth.append(({"logger": name}, handler.queue.qsize()))
+        for level, count in handler.dropped.items():
+            dropped.append(({"logger": name, "level": level}, count))
+    return [
+        ("log_queue_depth", "gauge", "Log records waiting for the background writer", depth),
+        ("log_records_dropped_total", "counter", "Log records dropped because the queue was full", dropped),
+    ]
 
 
 def setup_logger(
     name: str = "monorepo",
     level: Optional[str] = None,
-    format_string: Optional[str] = None
+    format_string: Optional[str] = None,
+    use_queue: Optional[bool] = None,
 ) -> logging.Logger:
-    """Setup and configure logger."""
+    """Setup and configure logger.
+
+    In queue mode (the default) records are handed to a background thread
+    that formats and writes them, so logging never blocks on stdout.
+    Records below WARNING are sampled per message template.
+    """
     settings = get_settings()
     log_level = level or settings.log_level
+    if use_queue is None:
+        use_queue = settings.log_queue_enabled
 
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, log_level.upper()))
 
-    # Remove existing handlers
+    # Remove existing handlers and filters
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    for log_filter in logger.filters[:]:
+        if isinstance(log_filter, SamplingFilter):
+            logger.removeFilter(log_filter)
+    if name in _log_queues:
+        _log_queues.pop(name)[1].stop()
 
     # Create console handler
     handler = logging.StreamHandler(sys.stdout)
     handler.setLevel(getattr(logging, log_level.upper()))
 
     # Create formatter
-    if not format_string:
-        format_string = (
-            "%(asctime)s - %(name)s - %(levelname)s - "
-            "%(filename)s:%(lineno)d - %(message)s"
-        )
-
-    formatter = logging.Formatter(format_string)
+    if format_string is None and settings.log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        if not format_string:
+            format_string = (
+                "%(asctime)s - %(name)s - %(levelname)s - "
+                "%(filename)s:%(lineno)d - %(message)s"
+            )
+        formatter = logging.Formatter(format_string)
     handler.setFormatter(formatter)
 
+    if use_queue:
+        queue_handler = DroppingQueueHandler(settings.log_queue_size)
+        listener = logging.handlers.QueueListener(
+            queue_handler.queue, handler, respect_handler_level=True
+        )
+        listener.start()
+        _log_queues[name] = (queue_handler, listener)
+        metrics.register_collector("logging", collect_logging_metrics)
+        handler = queue_handler
+
     # Add handler to logger
     logger.addHandler(handler)
 
+    if settings.log_sample_rate > 1 or settings.log_sample_rates:
+        logger.addFilter(
+            SamplingFilter(
+                settings.log_sample_rate,
+                settings.log_sample_rates,
+                settings.log_sample_summary_seconds,
+            )
+        )
+
     return logger
 
 
-# Global logger instance
-logger = setup_logger()
+# Global logger instance, configured on first use
+logger = cast(logging.Logger, LazyProxy(setup_logger))
 
 
 def format_error_response(
@@ -65,23 +301,111 @@ def format_error_response(
     }
 
 
+# Compiled once at import; used by the single and batch helpers below
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_SLUG_INVALID_CHARS = re.compile(r'[^\w\s-]')
+_SLUG_SEPARATORS = re.compile(r'[-\s]+')
+
+# Strings per chunk handed to a worker process in batch helpers
+BATCH_CHUNK_SIZE = 10000
+
+
 def validate_email(email: str) -> bool:
     """Simple email validation."""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 
 def generate_slug(text: str, max_length: int = 50) -> str:
     """Generate URL-friendly slug from text."""
-    import re
-
     # Convert to lowercase and replace spaces with hyphens
-    slug = re.sub(r'[^\w\s-]', '', text.lower())
-    slug = re.sub(r'[-\s]+', '-', slug)
+    slug = _SLUG_INVALID_CHARS.sub('', text.lower())
+    slug = _SLUG_SEPARATORS.sub('-', slug)
 
     # Trim to max length
     if len(slug) > max_length:
         slug = slug[:max_length].rstrip('-')
 
-    return slug
\ No newline at end of file
+    return slug
+
+
+def _validate_email_chunk(emails: List[str]) -> List[bool]:
+    match = EMAIL_PATTERN.match
+    return [match(email) is not None for email in emails]
+
+
+def _generate_slug_chunk(texts: List[str], max_length: int) -> List[str]:
+    return [generate_slug(text, max_length) for text in texts]
+
+
+def _map_chunks_in_processes(
+    function: Callable[[List[str]], List[Any]],
+    items: Iterable[str],
+    processes: int,
+    chunk_size: int,
+) -> Iterator[Any]:
+    """Map ``function`` over chunks in worker processes, yielding in order.
+
+    At most two chunks per process are in flight, so memory stays bounded
+    however long ``items`` is.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    iterator = iter(items)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending: deque = deque()
+        while chunk := list(islice(iterator, chunk_size)):
+            pending.append(pool.submit(function, chunk))
+            if len(pending) >= processes * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def validate_emails(
+    emails: Iterable[str],
+    processes: int = 0,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+) -> Iterator[bool]:
+    """Validate many emails lazily, yielding one result per input in order.
+
+    With ``processes`` > 0 chunks are validated in that many worker
+    processes, which pays off for millions of strings.
+    """
+    if processes > 0:
+        yield from _map_chunks_in_processes(
+            _validate_email_chunk, emails, processes, chunk_size
+        )
+        return
+
+    match = EMAIL_PATTERN.match
+    for email in emails:
+        yield match(email) is not None
+
+
+def generate_slugs(
+    texts: Iterable[str],
+    max_length: int = 50,
+    processes: int = 0,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Generate slugs lazily, yielding one slug per input in order.
+
+    With ``processes`` > 0 chunks are slugified in that many worker
+    processes, which pays off for millions of strings.
+    """
+    if processes > 0:
+        yield from _map_chunks_in_processes(
+            partial(_generate_slug_chunk, max_length=max_length),
+            texts,
+            processes,
+            chunk_size,
+        )
+        return
+
+    strip = _SLUG_INVALID_CHARS.sub
+    separate = _SLUG_SEPARATORS.sub
+    for text in texts:
+        slug = separate('-', strip('', text.lower()))
+        if len(slug) > max_length:
+            slug = slug[:max_length].rstrip('-')
+        yield slug
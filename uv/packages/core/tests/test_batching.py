@@ -0,0 +1,97 @@
+"""
+Tests for batch loaders.
+"""
+
+import asyncio
+
+import pytest
+
+from monorepo_core.batching import BatchLoader, SyncBatchLoader, async_users_by_id, users_by_id
+from monorepo_core.database import DatabaseManager
+from monorepo_core.models import User
+from monorepo_core.query_stats import track_queries
+
+
+def test_batch_loader_merges_concurrent_loads():
+    """Test loads from concurrent tasks become one batch call."""
+    calls = []
+
+    async def batch_fn(keys):
+        calls.append(keys)
+        return {key: key * 10 for key in keys if key != 3}
+
+    async def run():
+        loader = BatchLoader(batch_fn, max_batch_size=3)
+        first = await asyncio.gather(*(loader.load(key) for key in (1, 2, 1, 3)))
+        second = await loader.load_many([4, 2, 5, 6, 7])
+        return loader, first, second
+
+    loader, first, second = asyncio.run(run())
+    assert first == [10, 20, 10, None]
+    assert second == [40, 20, 50, 60, 70]
+    # Distinct keys only, memoized, split at max_batch_size
+    assert calls == [[1, 2, 3], [4, 5, 6], [7]]
+    assert loader.batches == 3
+
+
+def test_batch_loader_errors_are_retried():
+    """Test a failed batch fails its loads and is not memoized."""
+    failures = [RuntimeError("down")]
+
+    async def batch_fn(keys):
+        if failures:
+            raise failures.pop()
+        return {key: key for key in keys}
+
+    async def run():
+        loader = BatchLoader(batch_fn)
+        results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+        return await loader.load_many([1, 2])
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_sync_batch_loader_defers_until_first_get():
+    """Test deferred keys are loaded together on first access."""
+    calls = []
+
+    def batch_fn(keys):
+        calls.append(keys)
+        return {key: key.upper() for key in keys}
+
+    loader = SyncBatchLoader(batch_fn)
+    a, b = loader.defer("a"), loader.defer("b")
+    assert calls == []
+    assert b.get() == "B" and a.get() == "A"
+    assert loader.load_many(["a", "c"]) == ["A", "C"]
+    assert calls == [["a", "b"], ["c"]]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Create a database manager with three users."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    manager.create_tables()
+    with manager.get_session() as session:
+        session.add_all(User(username=f"u{i}", email=f"u{i}@example.com") for i in range(3))
+        session.commit()
+    yield manager
+    asyncio.run(manager.dispose())
+
+
+def test_users_by_id_loaders(manager):
+    """Test both user loaders resolve ids with a single query."""
+    with manager.get_session() as session, track_queries() as stats:
+        users = users_by_id(session).load_many([3, 1, 42])
+        assert [user and user.username for user in users] == ["u2", "u0", None]
+    assert stats.count == 1
+
+    async def run():
+        async with manager.async_session() as session:
+            loader = async_users_by_id(session)
+            with track_queries() as stats:
+                users = await asyncio.gather(loader.load(2), loader.load(3))
+            return [user.username for user in users], stats.count
+
+    assert asyncio.run(run()) == (["u1", "u2"], 1)
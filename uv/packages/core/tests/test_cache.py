@@ -0,0 +1,167 @@
+"""
+Tests for cache module.
+"""
+
+import asyncio
+import threading
+import time
+
+from monorepo_core.cache import MISSING, LocalCache, TwoTierCache
+
+
+def _local_cache(**kwargs):
+    return TwoTierCache(use_redis=False, enabled=True, **kwargs)
+
+
+def test_local_cache_lru_and_ttl():
+    """Test least recently used eviction and expiry."""
+    local = LocalCache(maxsize=2, ttl=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    assert local.get("a") == 1
+
+    local.set("c", 3)
+    assert local.get("b") is MISSING
+    assert local.get("a") == 1
+
+    local.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert local.get("d") is MISSING
+
+
+def test_get_or_load_counts_hits_and_misses():
+    """Test read-through loading, invalidation and counters."""
+    cache = _local_cache(invalidation_window=0)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"id": 1}
+
+    assert cache.get_or_load("user:1", loader) == {"id": 1}
+    assert cache.get_or_load("user:1", loader) == {"id": 1}
+    cache.delete("user:1")
+    assert cache.get_or_load("user:1", loader) == {"id": 1}
+    assert cache.get_or_load("user:2", lambda: None) is None
+
+    stats = cache.stats()
+    assert len(calls) == 2
+    assert stats["local_hits"] == 1
+    assert stats["loads"] == 3
+    assert stats["local_size"] == 1
+
+
+def test_get_or_load_coalesces_threads():
+    """Test concurrent threads missing one key share a single load."""
+    cache = _local_cache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    threads = [
+        threading.Thread(target=cache.get_or_load, args=("hot", loader))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+
+
+def test_aget_or_load_coalesces_tasks():
+    """Test concurrent tasks missing one key share a single load."""
+    cache = _local_cache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(
+            *[cache.aget_or_load("hot", loader) for _ in range(10)]
+        )
+
+    assert asyncio.run(run()) == ["value"] * 10
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_per_key_ttl():
+    """Test a per-key TTL shortens the local tier's expiry."""
+    cache = TwoTierCache(enabled=True, use_redis=False, local_ttl=60)
+    cache.set("short", 1, ttl=0.01)
+    cache.set("long", 2)
+    time.sleep(0.02)
+    assert cache.get("short") is MISSING
+    assert cache.get("long") == 2
+
+
+def test_load_racing_invalidation_is_not_cached():
+    """Test a load that read the old value cannot repopulate after a delete."""
+    cache = _local_cache(invalidation_window=60)
+    values = iter(["old", "new"])
+    started = None
+
+    async def loader():
+        started.set()
+        await asyncio.sleep(0.01)
+        return next(values)
+
+    async def run():
+        nonlocal started
+        started = asyncio.Event()
+        stale = asyncio.ensure_future(cache.aget_or_load("k", loader))
+        await started.wait()
+        # A write lands while the first load is still running
+        await cache.adelete("k")
+        fresh = await cache.aget_or_load("k", loader)
+        return await stale, fresh
+
+    assert asyncio.run(run()) == ("old", "new")
+    assert cache.get("k") is MISSING
+
+    cache.set("k", "written")
+    assert cache.get("k") == "written"
+
+
+def test_loads_cached_again_after_invalidation_window():
+    """Test loads are stored once the invalidation window has passed."""
+    cache = _local_cache(invalidation_window=0.01)
+    cache.delete("k")
+    assert cache.get_or_load("k", lambda: 1) == 1
+    assert cache.get("k") is MISSING
+
+    time.sleep(0.02)
+    assert cache.get_or_load("k", lambda: 2) == 2
+    assert cache.get("k") == 2
+
+
+def test_waiters_survive_cancelled_loader():
+    """Test cancelling the loading caller does not fail callers waiting on it."""
+    cache = _local_cache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return "value"
+
+    async def run():
+        first = asyncio.ensure_future(cache.aget_or_load("k", loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(cache.aget_or_load("k", loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        first.cancel()
+        results = await asyncio.gather(*waiters)
+        return first.cancelled(), results
+
+    assert asyncio.run(run()) == (True, ["value"] * 3)
+    # One waiter reloaded; the others coalesced onto its load
+    assert len(calls) == 2
@@ -0,0 +1,73 @@
+"""
+Tests for exact, cached and estimated user counts.
+"""
+
+import asyncio
+
+import pytest
+
+from monorepo_core import counting
+from monorepo_core.cache import TwoTierCache
+from monorepo_core.database import DatabaseManager
+from monorepo_core.models import User
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Create a database with 40 users, every fourth one inactive."""
+    monkeypatch.setattr(counting, "cache", TwoTierCache(enabled=True, use_redis=False))
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    manager.create_tables()
+    with manager.get_session() as session:
+        session.add_all(
+            User(username=f"u{i}", email=f"u{i}@example.com", is_active=i % 4 != 0)
+            for i in range(40)
+        )
+        session.commit()
+    yield manager
+    asyncio.run(manager.dispose())
+
+
+def _run(manager, function, *args):
+    async def run():
+        async with manager.async_session() as session:
+            return await function(session, *args)
+
+    return asyncio.run(run())
+
+
+def test_exact_and_cached_counts(manager):
+    """Test exact counts and cached counts until invalidated."""
+    assert _run(manager, counting.count_users) == 40
+    assert _run(manager, counting.count_users, False) == 10
+    assert _run(manager, counting.cached_count_users, True) == 30
+
+    with manager.get_session() as session:
+        session.add(User(username="new", email="new@example.com"))
+        session.commit()
+    assert _run(manager, counting.cached_count_users, True) == 30
+    counting.cache.delete("users:count:active")
+    assert _run(manager, counting.cached_count_users, True) == 31
+
+
+def test_cached_count_ignores_invalidation_window(manager, monkeypatch):
+    """Test a count read right after a write is cached, unlike per-user rows."""
+    cache = TwoTierCache(enabled=True, use_redis=False, invalidation_window=60)
+    monkeypatch.setattr(counting, "cache", cache)
+
+    cache.delete("users:count:all")
+    for _ in range(5):
+        assert _run(manager, counting.cached_count_users) == 40
+    assert cache.stats()["loads"] == 1
+
+
+def test_estimated_counts_from_sqlite_stats(manager):
+    """Test estimates read sqlite_stat1 once the database is analyzed."""
+    assert _run(manager, counting.estimate_count_users) is None
+    assert _run(manager, counting.total_users, "estimated") == (40, "cached")
+
+    with manager.engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    assert _run(manager, counting.estimate_count_users) == 40
+    assert _run(manager, counting.estimate_count_users, True) == 30
+    assert _run(manager, counting.total_users, "estimated", False) == (10, "estimated")
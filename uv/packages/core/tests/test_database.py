@@ -0,0 +1,232 @@
+"""
+Tests for database module.
+"""
+
+import asyncio
+import contextlib
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from monorepo_core.config import get_settings
+from monorepo_core.database import DatabaseBusyError, DatabaseManager, to_async_url
+from monorepo_core.models import User
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Create a database manager backed by a temporary SQLite file."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    manager.create_tables()
+    yield manager
+    asyncio.run(manager.dispose())
+
+
+def test_to_async_url():
+    """Test async URL derivation."""
+    assert to_async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert (
+        to_async_url("postgresql+psycopg2://u:p@db/app")
+        == "postgresql+asyncpg://u:p@db/app"
+    )
+    assert to_async_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+    with pytest.raises(ValueError):
+        to_async_url("oracle://db/app")
+
+
+def test_async_session(manager):
+    """Test async session commits and is visible to sync sessions."""
+
+    async def create_user():
+        async with manager.async_session() as session:
+            session.add(User(email="a@example.com", username="alice"))
+
+    asyncio.run(create_user())
+
+    with manager.get_session() as session:
+        assert session.query(User).filter(User.username == "alice").count() == 1
+
+    async def load_user():
+        async with manager.async_session() as session:
+            result = await session.execute(select(User).where(User.username == "alice"))
+            return result.scalar_one()
+
+    assert asyncio.run(load_user()).email == "a@example.com"
+
+
+@pytest.fixture
+def replicated(tmp_path):
+    """Create a manager with one replica, each seeded with a distinct user."""
+    replica = DatabaseManager(f"sqlite:///{tmp_path / 'replica.db'}")
+    replica.create_tables()
+    with replica.get_session() as session:
+        session.add(User(email="r@example.com", username="from-replica"))
+
+    manager = DatabaseManager(
+        f"sqlite:///{tmp_path / 'primary.db'}",
+        replica_urls=[replica.database_url],
+    )
+    manager.create_tables()
+    with manager.get_session() as session:
+        session.add(User(email="p@example.com", username="from-primary"))
+
+    yield manager
+    asyncio.run(manager.dispose())
+    asyncio.run(replica.dispose())
+
+
+def _usernames(session):
+    return [user.username for user in session.query(User).all()]
+
+
+def test_readonly_session_uses_replica(replicated):
+    """Test read-only sessions are routed to the replica."""
+    with replicated.get_session(readonly=True) as session:
+        assert _usernames(session) == ["from-replica"]
+
+    with replicated.get_session() as session:
+        assert _usernames(session) == ["from-primary"]
+
+    async def load_usernames():
+        async with replicated.async_session(readonly=True) as session:
+            result = await session.execute(select(User.username))
+            return result.scalars().all()
+
+    assert asyncio.run(load_usernames()) == ["from-replica"]
+
+
+def test_unhealthy_replica_falls_back_to_primary(replicated):
+    """Test reads fall back to the primary when no replica is healthy."""
+    replicated.replicas[0].mark_unhealthy()
+
+    with replicated.get_session(readonly=True) as session:
+        assert _usernames(session) == ["from-primary"]
+
+    assert list(replicated.check_replicas().values()) == [True]
+    with replicated.get_session(readonly=True) as session:
+        assert _usernames(session) == ["from-replica"]
+
+
+def test_unreachable_replica_is_skipped(tmp_path):
+    """Test connection failures take a replica out of rotation."""
+    manager = DatabaseManager(
+        f"sqlite:///{tmp_path / 'primary.db'}",
+        replica_urls=[f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"],
+    )
+    manager.create_tables()
+
+    assert list(manager.check_replicas().values()) == [False]
+    with manager.get_session(readonly=True) as session:
+        assert session.query(User).count() == 0
+
+
+def test_pool_stats(tmp_path, monkeypatch):
+    """Test pool settings are applied and checkout timeouts are counted."""
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "1")
+    monkeypatch.setenv("DATABASE_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DATABASE_POOL_TIMEOUT", "0.05")
+    get_settings.cache_clear()
+    try:
+        manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    finally:
+        get_settings.cache_clear()
+
+    with manager.engine.connect():
+        stats = manager.pool_stats()["primary"]["sync"]
+        assert stats["size"] == 1
+        assert stats["checked_out"] == 1
+
+        with pytest.raises(PoolTimeoutError):
+            manager.engine.connect()
+
+    stats = manager.pool_stats()["primary"]["sync"]
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+
+    # Counters survive the pool being recreated on dispose, and the new
+    # pool's checkouts are timed too
+    asyncio.run(manager.dispose())
+    assert manager.pool_stats()["primary"]["sync"]["timeouts"] == 1
+    with manager.engine.connect():
+        pass
+    assert manager.pool_stats()["primary"]["sync"]["checkouts"] == 2
+
+
+def test_request_session_fails_fast(tmp_path, monkeypatch):
+    """Test request sessions are refused, not queued, on an exhausted pool."""
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "1")
+    monkeypatch.setenv("DATABASE_MAX_OVERFLOW", "0")
+    get_settings.cache_clear()
+    try:
+        manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    finally:
+        get_settings.cache_clear()
+
+    with manager.engine.connect():
+        with pytest.raises(DatabaseBusyError):
+            with manager.request_session() as session:
+                session.execute(select(1))
+
+    with manager.request_session() as session:
+        session.execute(select(1))
+    assert manager.pool_stats()["primary"]["sync"]["checked_out"] == 0
+    assert manager.pool_stats()["primary"]["sync"]["rejections"] == 1
+
+    async def exhaust_async_pool():
+        async with manager.async_engine.connect():
+            with pytest.raises(DatabaseBusyError):
+                async with manager.async_request_session() as session:
+                    await session.execute(select(1))
+
+    asyncio.run(exhaust_async_pool())
+    assert manager.pool_stats()["primary"]["async"]["rejections"] == 1
+    asyncio.run(manager.dispose())
+
+
+def test_request_sessions_admitted_at_checkout(tmp_path, monkeypatch):
+    """Test only sessions that need a connection count against the pool."""
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "1")
+    monkeypatch.setenv("DATABASE_MAX_OVERFLOW", "0")
+    get_settings.cache_clear()
+    try:
+        manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    finally:
+        get_settings.cache_clear()
+
+    async def burst():
+        async with contextlib.AsyncExitStack() as stack:
+            # Many open sessions that never query are all admitted
+            sessions = [
+                await stack.enter_async_context(manager.async_request_session())
+                for _ in range(5)
+            ]
+            await sessions[0].execute(select(1))
+            with pytest.raises(DatabaseBusyError):
+                await sessions[1].execute(select(1))
+            # The session holding the connection keeps using it
+            await sessions[0].execute(select(1))
+        async with manager.async_request_session() as session:
+            await session.execute(select(1))
+
+    asyncio.run(burst())
+    assert manager.pool_stats()["primary"]["async"]["rejections"] == 1
+    asyncio.run(manager.dispose())
+
+
+def test_sqlite_pragmas(manager):
+    """Test SQLite file connections are opened in WAL mode with tuned pragmas."""
+    with manager.engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+    async def journal_mode():
+        async with manager.async_engine.connect() as connection:
+            result = await connection.exec_driver_sql("PRAGMA journal_mode")
+            return result.scalar()
+
+    assert asyncio.run(journal_mode()) == "wal"
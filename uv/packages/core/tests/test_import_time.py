@@ -0,0 +1,60 @@
+"""
+Import-time benchmark for the core package.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+# Override with MONOREPO_IMPORT_BUDGET_MS on slow CI machines
+IMPORT_BUDGET_MS = float(os.environ.get("MONOREPO_IMPORT_BUDGET_MS", "50"))
+
+
+def _run(code: str, cwd) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=cwd,
+    )
+    return result.stdout
+
+
+def test_import_time_budget(tmp_path):
+    """Test importing the package stays within the import-time budget."""
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import monorepo_core\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    best_ms = min(float(_run(code, tmp_path)) for _ in range(5))
+
+    assert best_ms < IMPORT_BUDGET_MS, (
+        f"import monorepo_core took {best_ms:.1f} ms "
+        f"(budget {IMPORT_BUDGET_MS:.0f} ms)"
+    )
+
+
+def test_import_has_no_side_effects(tmp_path):
+    """Test importing singletons does not read settings or build them."""
+    code = (
+        "import json, logging, sys\n"
+        "from monorepo_core import db_manager, get_settings, logger\n"
+        "print(json.dumps({\n"
+        "    'settings_loaded': get_settings.cache_info().currsize > 0,\n"
+        "    'db_manager_built': db_manager._lazy_is_built(),\n"
+        "    'logger_built': logger._lazy_is_built(),\n"
+        "    'handlers': len(logging.getLogger('monorepo').handlers),\n"
+        "}))\n"
+    )
+    state = json.loads(_run(code, tmp_path))
+
+    assert state == {
+        "settings_loaded": False,
+        "db_manager_built": False,
+        "logger_built": False,
+        "handlers": 0,
+    }
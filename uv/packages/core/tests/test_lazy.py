@@ -0,0 +1,30 @@
+"""
+Tests for lazy singletons.
+"""
+
+from monorepo_core.lazy import LazyProxy
+
+
+class _Counter:
+    def __init__(self):
+        self.value = 0
+
+
+def test_lazy_proxy_builds_once():
+    """Test the factory runs once, on first attribute access."""
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return _Counter()
+
+    proxy = LazyProxy(factory)
+    assert calls == []
+    assert not proxy._lazy_is_built()
+
+    proxy.value += 1
+    proxy.value += 1
+
+    assert proxy.value == 2
+    assert calls == [1]
+    assert proxy._lazy_is_built()
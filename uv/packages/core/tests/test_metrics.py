@@ -0,0 +1,40 @@
+"""
+Tests for metrics module.
+"""
+
+from monorepo_core.metrics import MetricsRegistry
+
+
+def test_render_prometheus_text():
+    """Test counters, gauges and histograms render in exposition format."""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    in_flight = registry.gauge("in_flight", "In flight")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    requests.inc(("/users/{id}",))
+    requests.inc(("/users/{id}",))
+    in_flight.inc()
+    in_flight.dec()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    registry.register_collector(
+        "extra", lambda: [("extra_value", "gauge", "Extra", [({"kind": 'a"b'}, 1.5)])]
+    )
+
+    text = registry.render()
+
+    assert 'requests_total{route="/users/{id}"} 2' in text
+    assert "in_flight 0" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'extra_value{kind="a\\"b"} 1.5' in text
+
+
+def test_registry_returns_existing_metric():
+    """Test metrics are shared by name."""
+    registry = MetricsRegistry()
+    assert registry.counter("hits_total", "Hits") is registry.counter("hits_total", "Hits")
@@ -0,0 +1,94 @@
+"""
+Tests for online data migrations.
+"""
+
+import pytest
+from sqlalchemy import Boolean, create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+
+from monorepo_core.migrations import migrate_is_active_to_boolean
+from monorepo_core.models import User
+
+LEGACY_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL PRIMARY KEY,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    username VARCHAR(100) NOT NULL UNIQUE,
+    full_name VARCHAR(255),
+    is_active VARCHAR(10) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def _legacy_engine(tmp_path, flags):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(LEGACY_SCHEMA))
+        for i, flag in enumerate(flags, start=1):
+            conn.execute(
+                text("INSERT INTO users (id, email, username, is_active) VALUES (:i, :e, :u, :a)"),
+                {"i": i, "e": f"u{i}@example.com", "u": f"u{i}", "a": flag},
+            )
+    return engine
+
+
+def test_migrate_is_active_to_boolean(tmp_path):
+    """Test legacy text flags are converted in batches and indexed."""
+    flags = ["true", "false", "TRUE", "0", " yes ", "true", "no"]
+    engine = _legacy_engine(tmp_path, flags)
+
+    stats = migrate_is_active_to_boolean(engine, batch_size=3)
+    assert stats == {"batches": 3, "rows": 7, "swapped": 1}
+
+    columns = {col["name"]: col["type"] for col in inspect(engine).get_columns("users")}
+    assert isinstance(columns["is_active"], Boolean)
+    assert "is_active_legacy" not in columns and "is_active_new" not in columns
+    index_names = {index["name"] for index in inspect(engine).get_indexes("users")}
+    assert {"ix_users_active_id", "ix_users_active_created_at_id"} <= index_names
+
+    with engine.connect() as conn:
+        active = conn.scalars(select(User.id).where(User.is_active).order_by(User.id)).all()
+    assert active == [1, 3, 5, 6]
+
+    # Re-running is a no-op
+    assert migrate_is_active_to_boolean(engine)["swapped"] == 0
+    engine.dispose()
+
+
+@pytest.mark.parametrize("drop_legacy", [True, False])
+def test_inserts_work_after_migration(tmp_path, drop_legacy):
+    """Test new rows can be written whether or not the legacy column is kept."""
+    engine = _legacy_engine(tmp_path, ["true", "false"])
+    migrate_is_active_to_boolean(engine, drop_legacy=drop_legacy)
+
+    columns = {col["name"]: col for col in inspect(engine).get_columns("users")}
+    if drop_legacy:
+        assert "is_active_legacy" not in columns
+    else:
+        assert columns["is_active_legacy"]["nullable"]
+        with engine.connect() as conn:
+            legacy = conn.scalars(text("SELECT is_active_legacy FROM users ORDER BY id")).all()
+        assert legacy == ["true", "false"]
+
+    with Session(engine) as session:
+        session.add(User(email="new@example.com", username="new"))
+        session.commit()
+        assert session.scalar(select(User.is_active).where(User.username == "new")) is True
+    engine.dispose()
+
+
+def test_active_filter_uses_partial_index(tmp_path):
+    """Test SQLite plans active-only queries on the partial index."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    User.metadata.create_all(engine)
+    query = select(User.id).where(User.is_active).order_by(User.created_at, User.id)
+
+    with engine.connect() as conn:
+        compiled = query.compile(engine)
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}", tuple(compiled.params.values())
+        ).all()
+    assert "ix_users_active_created_at_id" in str(plan)
+    engine.dispose()
@@ -0,0 +1,61 @@
+"""
+Tests for query_stats module.
+"""
+
+import logging
+
+from sqlalchemy import create_engine, text
+
+from monorepo_core.query_stats import (
+    current_query_stats,
+    instrument_engine,
+    redact_parameters,
+    track_queries,
+)
+
+
+def test_track_queries_counts_statements():
+    """Test statements are attributed to the innermost tracked block."""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_query_ms=0)
+
+    assert current_query_stats() is None
+    with track_queries("outer") as outer:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            with track_queries("inner") as inner:
+                connection.execute(text("SELECT 2"))
+                connection.execute(text("SELECT 3"))
+            assert current_query_stats() is outer
+
+    assert outer.count == 1
+    assert inner.count == 2
+    assert inner.total_seconds > 0
+    assert current_query_stats() is None
+
+
+def test_slow_query_log_redacts_parameters(caplog):
+    """Test slow statements are logged with parameter types, not values."""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_query_ms=1e-9)
+
+    with caplog.at_level(logging.WARNING, logger="monorepo"):
+        with track_queries("GET /users/{user_id}") as stats:
+            with engine.connect() as connection:
+                connection.execute(
+                    text("SELECT :email AS email"), {"email": "secret@example.com"}
+                )
+
+    assert stats.slow == 1
+    message = caplog.records[-1].getMessage()
+    assert "[GET /users/{user_id}]" in message
+    assert "SELECT ? AS email" in message
+    assert "params=('str',)" in message
+    assert "secret@example.com" not in message
+
+
+def test_redact_parameters():
+    """Test redaction of positional, named and executemany parameters."""
+    assert redact_parameters((1, "a", None)) == ("int", "str", "NoneType")
+    assert redact_parameters({"id": 1}) == {"id": "int"}
+    assert redact_parameters([(1, "a"), (2, "b")]) == [("int", "str"), "... 2 rows"]
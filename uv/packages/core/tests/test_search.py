@@ -0,0 +1,119 @@
+"""
+Tests for indexed user search.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+
+from monorepo_core import models
+from monorepo_core.database import DatabaseManager
+from monorepo_core.models import User
+from monorepo_core.search import (
+    install_user_search,
+    search_terms,
+    user_search_indexed,
+    user_search_query,
+)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Create a database manager with a few users."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    manager.create_tables()
+    with manager.get_session() as session:
+        session.add_all([
+            User(username="alice", email="alice@example.com", full_name="Alice Smith"),
+            User(username="bob", email="bob@corp.example", full_name="Robert Malice"),
+            User(username="carol", email="carol@example.com"),
+        ])
+        session.commit()
+    yield manager
+    asyncio.run(manager.dispose())
+
+
+def _search(manager, query):
+    with manager.get_session() as session:
+        terms = search_terms(query)
+        users = session.scalars(user_search_query("sqlite", terms)).all()
+        return [user.username for user in users]
+
+
+def test_search_terms():
+    """Test short terms are dropped and the rest lowercased."""
+    assert search_terms("  Al SMITH exa ") == ["smith", "exa"]
+
+
+def test_search_ranks_and_tracks_writes(manager):
+    """Test substring matches are ranked and kept in sync by triggers."""
+    # A username match outranks a full-name match
+    assert _search(manager, "alice") == ["alice", "bob"]
+    assert sorted(_search(manager, "EXAMPLE.COM")) == ["alice", "carol"]
+    assert _search(manager, "example smi") == ["alice"]
+
+    with manager.get_session() as session:
+        carol = session.query(User).filter(User.username == "carol").one()
+        carol.full_name = "Carol Smithers"
+        session.delete(session.query(User).filter(User.username == "alice").one())
+        session.commit()
+
+    assert _search(manager, "smith") == ["carol"]
+    assert _search(manager, "alice") == ["bob"]
+
+
+def test_install_user_search_backfills(manager):
+    """Test installing on a database without the index fills it."""
+    with manager.engine.begin() as conn:
+        conn.execute(text("DROP TABLE users_fts"))
+        for trigger in ("insert", "update", "delete"):
+            conn.execute(text(f"DROP TRIGGER users_fts_{trigger}"))
+
+    install_user_search(manager.engine)
+    install_user_search(manager.engine)
+    assert _search(manager, "carol") == ["carol"]
+
+    manager.drop_tables()
+    with manager.engine.connect() as conn:
+        tables = conn.scalars(text("SELECT name FROM sqlite_master WHERE type = 'table'")).all()
+    assert not [name for name in tables if name.startswith("users")]
+
+
+def test_search_without_fts5_trigram(tmp_path, monkeypatch):
+    """Test older SQLite builds skip the FTS index and search with LIKE."""
+    monkeypatch.setattr(models, "SQLITE_TRIGRAM_MIN_VERSION", (99, 0, 0))
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    manager.create_tables()
+    with manager.get_session() as session:
+        session.add(User(username="alice", email="alice@example.com"))
+        session.commit()
+
+    assert install_user_search(manager.engine) is False
+    with manager.get_session() as session:
+        indexed = user_search_indexed(session.connection())
+        users = session.scalars(user_search_query("sqlite", ["lic"], indexed)).all()
+        assert [user.username for user in users] == ["alice"]
+    assert not indexed
+    asyncio.run(manager.dispose())
+
+
+def test_search_index_lookup_is_cached(manager, monkeypatch):
+    """Test the catalog is consulted once per database and refreshed on install."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(manager.engine, "before_cursor_execute", record)
+    with manager.engine.connect() as conn:
+        assert user_search_indexed(conn)
+        assert user_search_indexed(conn)
+    assert sum("sqlite_master" in statement for statement in statements) == 1
+
+    monkeypatch.setattr(models, "SQLITE_TRIGRAM_MIN_VERSION", (99, 0, 0))
+    assert install_user_search(manager.engine) is False
+    statements.clear()
+    with manager.engine.connect() as conn:
+        assert not user_search_indexed(conn)
+    assert statements == []
@@ -0,0 +1,190 @@
+"""
+Tests for utils module.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+import pytest
+
+from monorepo_core.utils import (
+    DroppingQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    generate_slug,
+    generate_slugs,
+    setup_logger,
+    validate_email,
+    validate_emails,
+)
+
+EMAILS = ["user@example.com", "bad@", "first.last+tag@sub.example.org", "no-at-sign", "a@b.c"]
+TEXTS = ["Hello World!", "  Spaces  and -- dashes ", "Ünïcödé Tïtle", "x" * 80 + " tail", ""]
+
+
+def test_json_formatter():
+    """Test records render as compact JSON with extras and tracebacks."""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "monorepo", logging.ERROR, "app.py", 12, "Failed user %s", (7,), None
+        )
+        record.exc_info = sys.exc_info()
+    record.request_id = "abc"
+
+    line = JsonFormatter().format(record)
+    payload = json.loads(line)
+    assert "\n" not in line
+    assert payload["level"] == "ERROR"
+    assert payload["msg"] == "Failed user 7"
+    assert payload["src"] == "app.py:12"
+    assert payload["request_id"] == "abc"
+    assert "ValueError: boom" in payload["exc"]
+    assert payload["ts"].endswith("+00:00")
+
+
+def test_queue_handler_drops_and_reports():
+    """Test a full queue drops records without blocking and reports the loss."""
+    handler = DroppingQueueHandler(maxsize=2)
+    logger = logging.getLogger("monorepo.test.dropping")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(5):
+            logger.warning("record %d", i)
+        assert handler.dropped == {"WARNING": 3}
+
+        assert handler.queue.get_nowait().getMessage() == "record 0"
+        assert handler.queue.get_nowait().getMessage() == "record 1"
+        logger.warning("after")
+        assert handler.queue.get_nowait().getMessage() == (
+            "Dropped 3 log records: logging queue full"
+        )
+        assert handler.queue.get_nowait().getMessage() == "after"
+        assert handler.queue.empty()
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_setup_logger_queue_mode(capsys):
+    """Test queue mode writes formatted records from the listener thread."""
+    logger = setup_logger("monorepo.test.queued", format_string="%(message)s", use_queue=True)
+    logger.info("hello %s", "world")
+
+    from monorepo_core.utils import _log_queues
+
+    handler, listener = _log_queues.pop("monorepo.test.queued")
+    listener.stop()
+    assert isinstance(handler.queue, queue.Queue)
+    assert capsys.readouterr().out == "hello world\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_setup_logger_queue_mode_after_fork(tmp_path):
+    """Test a forked child's records are written by its own listener."""
+    from monorepo_core.utils import _log_queues, _stop_log_listeners
+
+    name = "monorepo.test.forked"
+    logger = setup_logger(name, format_string="%(message)s", use_queue=True)
+    path = tmp_path / "log.txt"
+    stream = open(path, "w", buffering=1)
+    _, listener = _log_queues[name]
+    listener.handlers[0].setStream(stream)
+    try:
+        pid = os.fork()
+        if pid == 0:
+            # Child: log, flush through the listener and exit without cleanup
+            try:
+                logger.info("from child %d", os.getpid())
+                _stop_log_listeners()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        assert path.read_text() == f"from child {pid}\n"
+    finally:
+        _log_queues.pop(name)[1].stop()
+        stream.close()
+
+
+def test_sampling_filter():
+    """Test 1 in N sampling per template, with WARNING and above always kept."""
+    sampler = SamplingFilter(rate=3, rates={"Rare %s": 1}, summary_seconds=3600)
+    logger = logging.getLogger("monorepo.test.sampling")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.handlers.BufferingHandler(capacity=1000)
+    logger.addHandler(handler)
+    logger.addFilter(sampler)
+    try:
+        for i in range(7):
+            logger.info("Created user: %s", i)
+            logger.info("Rare %s", i)
+            logger.warning("Careful %s", i)
+
+        messages = [record.getMessage() for record in handler.buffer]
+        assert [m for m in messages if m.startswith("Created")] == [
+            "Created user: 0", "Created user: 3", "Created user: 6"
+        ]
+        assert sum(m.startswith("Rare") for m in messages) == 7
+        assert sum(m.startswith("Careful") for m in messages) == 7
+
+        sampler.summarize()
+        summary = handler.buffer[-1]
+        assert summary.getMessage() == "Suppressed 4 similar messages: 'Created user: %s'"
+        assert summary.suppressed == 4
+    finally:
+        logger.removeFilter(sampler)
+        logger.removeHandler(handler)
+
+
+def test_batch_helpers_match_single_helpers():
+    """Test batch helpers stream the same results, in order, as the single ones."""
+    emails = EMAILS * 3
+    texts = TEXTS * 3
+    expected_emails = [validate_email(email) for email in emails]
+    expected_slugs = [generate_slug(text, 20) for text in texts]
+
+    assert expected_emails[:5] == [True, False, True, False, False]
+    assert list(validate_emails(iter(emails))) == expected_emails
+    assert list(generate_slugs(iter(texts), max_length=20)) == expected_slugs
+
+    assert list(validate_emails(emails, processes=2, chunk_size=4)) == expected_emails
+    assert list(generate_slugs(texts, 20, processes=2, chunk_size=4)) == expected_slugs
+
+
+def _validate_email_uncompiled(email):
+    """The previous implementation, which rebuilt its pattern per call."""
+    import re
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+
+@pytest.mark.skipif(
+    not os.environ.get("MONOREPO_BENCHMARKS"),
+    reason="set MONOREPO_BENCHMARKS=1 to run benchmarks",
+)
+def test_batch_helpers_benchmark():
+    """Benchmark throughput per million strings, before and after."""
+    count = 200_000
+    emails = EMAILS * (count // len(EMAILS))
+    texts = TEXTS * (count // len(TEXTS))
+
+    def seconds_per_million(function):
+        start = time.perf_counter()
+        function()
+        return (time.perf_counter() - start) * 1_000_000 / count
+
+    uncompiled_s = seconds_per_million(lambda: [_validate_email_uncompiled(e) for e in emails])
+    emails_s = seconds_per_million(lambda: sum(validate_emails(emails)))
+    slugs_s = seconds_per_million(lambda: sum(1 for _ in generate_slugs(texts)))
+
+    assert emails_s < uncompiled_s, (
+        f"per 1M strings: validate_email per call {uncompiled_s:.2f} s, "
+        f"validate_emails {emails_s:.2f} s, generate_slugs {slugs_s:.2f} s"
+    )
@@ -2,71 +2,616 @@
 User management API endpoints.
 """
 
-from typing import List
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import String, and_, delete, func, insert, literal, or_, select, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from monorepo_core import db_manager, logger
-from monorepo_core.models import User, UserCreate, UserResponse
+from monorepo_core import db_manager, get_settings, logger
+from monorepo_core.batching import async_users_by_id
+from monorepo_core.cache import USER_COUNT_CACHE_KEYS, cache, user_cache_key
+from monorepo_core.counting import CountMode, total_users
+from monorepo_core.models import (
+    BulkUserResponse,
+    BulkUserResult,
+    User,
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+)
+from monorepo_core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from monorepo_core.search import (
+    SEARCH_MIN_TERM_LENGTH,
+    search_terms,
+    user_search_indexed,
+    user_search_query,
+)
+
+from ..conditional import (
+    is_not_modified,
+    make_validators,
+    not_modified_response,
+    validator_headers,
+)
+from ..serialization import (
+    USER_FIELDS,
+    encode_json,
+    json_response,
+    parse_fields,
+    users_to_json,
+)
 
 router = APIRouter()
 
 
-def get_db():
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Database dependency."""
-    return next(db_manager.get_session_dependency())
+    async with db_manager.async_request_session() as session:
+        yield session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Read-only database dependency, served by a replica when available."""
+    async with db_manager.async_request_session(readonly=True) as session:
+        yield session
+
+
+def _cursor_created_at(position: dict, dialect_name: str):
+    """The cursor's creation time as a value comparable with the stored column."""
+    try:
+        created_at = datetime.fromisoformat(position["created_at"])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if dialect_name == "sqlite":
+        # SQLite keeps timestamps as text in CURRENT_TIMESTAMP's format
+        # (the server default), which sorts correctly only against the
+        # same format
+        text_value = created_at.strftime("%Y-%m-%d %H:%M:%S")
+        if created_at.microsecond:
+            text_value += created_at.strftime(".%f")
+        return literal(text_value, String)
+    return literal(created_at, User.created_at.type)
+
+
+def _keyset_condition(order: str, position: dict, dialect_name: str):
+    """Build the WHERE clause selecting rows after a cursor position."""
+    last_id = position.get("id")
+    if not isinstance(last_id, int):
+        raise InvalidCursorError("Invalid pagination cursor")
+
+    if order == "id":
+        return User.id > last_id
+
+    # Prefer the stored timestamp of the anchor row; the cursor copy is
+    # only used if that row was deleted since the cursor was issued.
+    last_created_at = func.coalesce(
+        select(User.created_at).where(User.id == last_id).scalar_subquery(),
+        _cursor_created_at(position, dialect_name),
+    )
+    return or_(
+        User.created_at > last_created_at,
+        and_(User.created_at == last_created_at, User.id > last_id),
+    )
+
+
+def _parse_ids(ids: str) -> List[int]:
+    """Parse a comma-separated id list, dropping duplicates but keeping order."""
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers"
+        )
+    parsed = list(dict.fromkeys(parsed))
+    if not parsed or len(parsed) > get_settings().api_max_page_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"ids must list 1 to {get_settings().api_max_page_size} ids"
+        )
+    return parsed
+
+
+async def _list_page(
+    db: AsyncSession,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    order: str,
+    active: Optional[bool],
+    columns: Optional[List[str]] = None,
+) -> Tuple[List[Any], Dict[str, str]]:
+    """Fetch one page of users and the headers pointing at the next one.
+
+    With ``columns`` only those columns are selected and rows are returned
+    instead of ``User`` instances.
+    """
+    limit = min(limit, get_settings().api_max_page_size)
+    order_by = [User.id] if order == "id" else [User.created_at, User.id]
+    if columns is None:
+        query = select(User)
+    else:
+        query = select(*(getattr(User, name) for name in columns))
+    query = query.order_by(*order_by)
+    if active is not None:
+        # The bare column matches the partial indexes' predicate
+        query = query.where(User.is_active if active else ~User.is_active)
+
+    if cursor is not None:
+        try:
+            position = decode_cursor(cursor)
+            if (
+                skip
+                or position.get("order") != order
+                or position.get("active") != active
+            ):
+                raise InvalidCursorError("Cursor does not match this query")
+            query = query.where(
+                _keyset_condition(order, position, db.get_bind().dialect.name)
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    else:
+        query = query.offset(skip)
+
+    # Fetch one extra row to learn whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    users = result.scalars().all() if columns is None else result.all()
+
+    headers = {}
+    if len(users) > limit:
+        users = users[:limit]
+        last = users[-1]
+        position = {"order": order, "id": last.id}
+        if active is not None:
+            position["active"] = active
+        if order == "created_at":
+            position["created_at"] = last.created_at.isoformat()
+        headers["X-Next-Cursor"] = encode_cursor(position)
+    return users, headers
 
 
 @router.get("/", response_model=List[UserResponse])
 async def list_users(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from a previous page's X-Next-Cursor header"
+    ),
+    order: Literal["id", "created_at"] = "id",
+    active: Optional[bool] = Query(
+        None, description="Only active (true) or inactive (false) users"
+    ),
+    ids: Optional[str] = Query(
+        None, description="Comma-separated ids to fetch instead of a page, in this order"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated UserResponse fields to return (default all)"
+    ),
+    count: Optional[CountMode] = Query(
+        None, description="Send the total in X-Total-Count: exact, cached or estimated"
+    ),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List all users."""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    """List users.
+
+    Pages are ordered by ``order`` and optionally filtered by ``active``.
+    When another page exists its cursor is returned in the
+    ``X-Next-Cursor`` header; passing it back as ``cursor`` seeks straight
+    to the next page instead of scanning ``skip`` rows. With ``ids`` the
+    listed users are fetched with one query and returned in the order
+    asked, skipping unknown ids. ``fields`` limits both the columns loaded
+    and the keys returned. Responses carry an ETag and requests with a
+    matching ``If-None-Match`` get ``304 Not Modified``; there is no
+    Last-Modified, which deletions could not advance.
+
+    ``count`` adds the number of users matching ``active`` (across all
+    pages) as ``X-Total-Count``, trading precision for cost: ``exact``
+    counts every time, ``cached`` reuses a count until it expires or a
+    write invalidates it, and ``estimated`` reads database statistics.
+    ``X-Total-Count-Mode`` reports the mode used, since estimates fall
+    back to cached counts when no statistics exist. With ``ids`` the
+    response is the whole result, so the total is the number of users
+    found and the mode is always ``exact``.
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    columns = None
+    if selected != USER_FIELDS:
+        # Plus whatever the cursor, validators and id filtering read
+        needed = set(selected) | {"id", "updated_at"}
+        if order == "created_at":
+            needed.add("created_at")
+        if ids is not None and active is not None:
+            needed.add("is_active")
+        columns = [name for name in USER_FIELDS if name in needed]
+
+    if ids is not None:
+        if cursor is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="ids cannot be combined with cursor"
+            )
+        loaded = await async_users_by_id(db, columns=columns).load_many(_parse_ids(ids))
+        users = [
+            user for user in loaded
+            if user is not None and (active is None or user.is_active == active)
+        ]
+        headers = {}
+        if count is not None:
+            headers["X-Total-Count"] = str(len(users))
+            headers["X-Total-Count-Mode"] = "exact"
+    else:
+        users, headers = await _list_page(db, skip, limit, cursor, order, active, columns)
+        if count is not None:
+            total, mode = await total_users(db, count, active)
+            headers["X-Total-Count"] = str(total)
+            headers["X-Total-Count-Mode"] = mode
+
+    # Rows come straight from our database, so skip re-validating them
+    body = users_to_json(users, fields=selected)
+    # No Last-Modified: deleted rows, or rows leaving the page or filter,
+    # never move the newest updated_at forward, so only the ETag is sound
+    etag, _ = make_validators(
+        ((user.id, user.updated_at) for user in users),
+        extra=headers.get("X-Next-Cursor", ""),
+        content=body,
+    )
+    if is_not_modified(request, etag, None):
+        return not_modified_response(etag, None, headers)
+    headers.update(validator_headers(etag, None))
+    return json_response(body, headers=headers)
+
+
+@router.get("/search", response_model=List[UserResponse])
+async def search_users(
+    q: str = Query(
+        ...,
+        min_length=SEARCH_MIN_TERM_LENGTH,
+        max_length=200,
+        description="Text to find in usernames, emails and full names",
+    ),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Search users, best matches first.
+
+    Every whitespace-separated term of at least three characters must
+    appear somewhere in the username, email or full name.
+    """
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Search terms must be at least {SEARCH_MIN_TERM_LENGTH} characters"
+        )
+
+    limit = min(limit, get_settings().api_max_page_size)
+    indexed = await db.run_sync(lambda session: user_search_indexed(session.connection()))
+    query = user_search_query(db.get_bind().dialect.name, terms, indexed)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return json_response(users_to_json(result.scalars().all()))
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new user."""
     try:
-        # Create new user
-        db_user = User(
-            email=user_data.email,
-            username=user_data.username,
-            full_name=user_data.full_name,
-        )
+        if db.get_bind().dialect.insert_returning:
+            # INSERT ... RETURNING fetches server defaults in the same trip
+            db_user = await db.scalar(
+                insert(User).values(**user_data.model_dump()).returning(User)
+            )
+            await db.commit()
+        else:
+            db_user = User(
+                email=user_data.email,
+                username=user_data.username,
+                full_name=user_data.full_name,
+            )
 
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+            db.add(db_user)
+            await db.commit()
+            await db.refresh(db_user)
 
-        logger.info(f"Created user: {db_user.username}")
+        await cache.adelete(*USER_COUNT_CACHE_KEYS)
+        logger.info("Created user: %s", db_user.username)
         return db_user
 
     except IntegrityError as e:
-        db.rollback()
-        logger.error(f"Failed to create user: {e}")
+        await db.rollback()
+        logger.error("Failed to create user: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email or username already exists"
         )
 
 
+def _parse_bulk_body(body: bytes, content_type: str) -> List[Any]:
+    """Parse a JSON array or NDJSON body into raw rows.
+
+    Unparseable NDJSON lines are returned as ``ValueError`` instances so
+    they can be reported against their row instead of failing the request.
+    """
+    if "ndjson" in content_type or "jsonl" in content_type:
+        rows: List[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(e)
+        return rows
+
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        rows = None
+    if not isinstance(rows, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a JSON array or an NDJSON body of users"
+        )
+    return rows
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Flatten a validation error into a single line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+async def _insert_users(db: AsyncSession, users: List[UserCreate]) -> Dict[str, int]:
+    """Insert users in one multi-row statement and return ids by username."""
+    values = [user.model_dump() for user in users]
+
+    if db.get_bind().dialect.insert_executemany_returning:
+        result = await db.execute(insert(User).returning(User.username, User.id), values)
+        return dict(result.all())
+
+    await db.execute(insert(User), values)
+    result = await db.execute(
+        select(User.username, User.id).where(
+            User.username.in_([value["username"] for value in values])
+        )
+    )
+    return dict(result.all())
+
+
+async def _import_chunk(
+    db: AsyncSession,
+    chunk: List[Tuple[int, UserCreate]],
+    results: List[Optional[BulkUserResult]],
+):
+    """Import one chunk of validated rows in its own transaction."""
+    existing = await db.execute(
+        select(User.email, User.username).where(
+            or_(
+                User.email.in_([user.email for _, user in chunk]),
+                User.username.in_([user.username for _, user in chunk]),
+            )
+        )
+    )
+    taken_emails, taken_usernames = set(), set()
+    for email, username in existing:
+        taken_emails.add(email)
+        taken_usernames.add(username)
+
+    pending = []
+    for index, user in chunk:
+        if user.email in taken_emails or user.username in taken_usernames:
+            results[index] = BulkUserResult(
+                index=index,
+                status="duplicate",
+                error="User with this email or username already exists"
+            )
+        else:
+            pending.append((index, user))
+
+    if not pending:
+        await db.rollback()
+        return
+
+    try:
+        ids = await _insert_users(db, [user for _, user in pending])
+        await db.commit()
+    except IntegrityError:
+        # A concurrent writer won the race for some row; retry one by one
+        # so only the conflicting rows fail.
+        await db.rollback()
+        ids = {}
+        for index, user in pending:
+            try:
+                ids.update(await _insert_users(db, [user]))
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                results[index] = BulkUserResult(
+                    index=index,
+                    status="duplicate",
+                    error="User with this email or username already exists"
+                )
+
+    for index, user in pending:
+        if results[index] is None:
+            results[index] = BulkUserResult(
+                index=index, status="created", id=ids[user.username]
+            )
+
+
+@router.post("/bulk", response_model=BulkUserResponse)
+async def create_users_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many users with batched INSERTs.
+
+    Accepts a JSON array or an NDJSON body (``application/x-ndjson``) of
+    users. Rows are inserted in chunks, each in its own transaction, and
+    invalid or duplicate rows are reported per row without failing the rest.
+    """
+    settings = get_settings()
+    rows = _parse_bulk_body(
+        await request.body(), request.headers.get("content-type", "")
+    )
+
+    if len(rows) > settings.api_bulk_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.api_bulk_max_rows} users per request"
+        )
+
+    results: List[Optional[BulkUserResult]] = [None] * len(rows)
+    valid: List[Tuple[int, UserCreate]] = []
+    seen_emails, seen_usernames = set(), set()
+
+    for index, row in enumerate(rows):
+        if isinstance(row, ValueError):
+            results[index] = BulkUserResult(
+                index=index, status="invalid", error=f"Invalid JSON: {row}"
+            )
+            continue
+
+        try:
+            user = UserCreate.model_validate(row)
+        except ValidationError as e:
+            results[index] = BulkUserResult(
+                index=index, status="invalid", error=_format_validation_error(e)
+            )
+            continue
+
+        if user.email in seen_emails or user.username in seen_usernames:
+            results[index] = BulkUserResult(
+                index=index,
+                status="duplicate",
+                error="Email or username repeated earlier in this request"
+            )
+            continue
+
+        seen_emails.add(user.email)
+        seen_usernames.add(user.username)
+        valid.append((index, user))
+
+    chunk_size = settings.api_bulk_chunk_size
+    for start in range(0, len(valid), chunk_size):
+        await _import_chunk(db, valid[start:start + chunk_size], results)
+
+    created = sum(1 for result in results if result.status == "created")
+    if created:
+        await cache.adelete(*USER_COUNT_CACHE_KEYS)
+    logger.info(
+        "Bulk imported users: %d created, %d failed", created, len(rows) - created
+    )
+
+    return BulkUserResponse(
+        created=created,
+        failed=len(rows) - created,
+        results=results,
+    )
+
+
+def _export_value(value: Any) -> Any:
+    """Convert a column value to its JSON/CSV representation."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def _export_users(export_format: str, chunk_size: int) -> AsyncGenerator[bytes, None]:
+    """Stream every user as NDJSON or CSV, one chunk of rows at a time."""
+    columns = list(UserResponse.model_fields)
+    query = (
+        select(*[getattr(User, column) for column in columns])
+        .order_by(User.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    # The response body is produced after request dependencies have been
+    # torn down, so the stream owns its session for its whole lifetime.
+    async with db_manager.async_session(readonly=True) as session:
+        result = await session.stream(query)
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue().encode()
+
+        async for partition in result.partitions():
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(
+                    [_export_value(value) for value in row] for row in partition
+                )
+                yield buffer.getvalue().encode()
+            else:
+                yield "".join(
+                    json.dumps(
+                        dict(zip(columns, map(_export_value, row))),
+                        separators=(",", ":"),
+                    ) + "\n"
+                    for row in partition
+                ).encode()
+
+
+@router.get("/export")
+async def export_users(
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    """Export all users as a streamed NDJSON or CSV download.
+
+    Rows are read through a server-side cursor in fixed-size chunks, so
+    memory use does not grow with the size of the table.
+    """
+    media_types = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+    return StreamingResponse(
+        _export_users(format, get_settings().api_export_chunk_size),
+        media_type=media_types[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    """Get user by ID.
+
+    Supports conditional requests via ETag / Last-Modified.
+    """
+
+    async def load_user():
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        return UserResponse.model_validate(user).model_dump(mode="json")
+
+    user = await cache.aget_or_load(user_cache_key(user_id), load_user)
 
     if not user:
         raise HTTPException(
@@ -74,6 +619,59 @@ async def get_user(
             detail="User not found"
         )
 
+    # The cached payload was produced by UserResponse, so encode it as is
+    body = encode_json(user)
+    etag, last_modified = make_validators(
+        [(user["id"], datetime.fromisoformat(user["updated_at"]))], content=body
+    )
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return json_response(body, headers=validator_headers(etag, last_modified))
+
+
+async def _update_user(
+    db: AsyncSession, user_id: int, values: Dict[str, Any]
+) -> Optional[User]:
+    """Apply ``values`` to a user and return it, or ``None`` if missing.
+
+    Uses a single UPDATE ... RETURNING where the backend supports it.
+    """
+    if not values:
+        return await db.get(User, user_id)
+
+    try:
+        if db.get_bind().dialect.update_returning:
+            user = await db.scalar(
+                update(User)
+                .where(User.id == user_id)
+                .values(**values)
+                .returning(User)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            user = await db.get(User, user_id)
+            if user is None:
+                return None
+            for field, value in values.items():
+                setattr(user, field, value)
+            await db.flush()
+            await db.refresh(user)
+        await db.commit()
+
+    except IntegrityError as e:
+        await db.rollback()
+        logger.error("Failed to update user: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email or username already exists"
+        )
+
+    if user is not None:
+        keys = [user_cache_key(user_id)]
+        if "is_active" in values:
+            keys.extend(USER_COUNT_CACHE_KEYS)
+        await cache.adelete(*keys)
+        logger.info("Updated user: %s", user.username)
     return user
 
 
@@ -81,54 +679,60 @@ async def get_user(
 async def update_user(
     user_id: int,
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await _update_user(db, user_id, user_data.model_dump())
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    return user
 
-    try:
-        # Update user fields
-        user.email = user_data.email
-        user.username = user_data.username
-        user.full_name = user_data.full_name
-
-        db.commit()
-        db.refresh(user)
 
-        logger.info(f"Updated user: {user.username}")
-        return user
+@router.patch("/{user_id}", response_model=UserResponse)
+async def patch_user(
+    user_id: int,
+    user_data: UserUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Update only the fields sent for a user."""
+    user = await _update_user(db, user_id, user_data.model_dump(exclude_unset=True))
 
-    except IntegrityError as e:
-        db.rollback()
-        logger.error(f"Failed to update user: {e}")
+    if not user:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email or username already exists"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
         )
+    return user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    if db.get_bind().dialect.delete_returning:
+        username = await db.scalar(
+            delete(User).where(User.id == user_id).returning(User.username)
+        )
+    else:
+        user = await db.get(User, user_id)
+        username = user.username if user else None
+        if user:
+            await db.delete(user)
 
-    if not user:
+    if username is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
-    db.delete(user)
-    db.commit()
+    await db.commit()
+    await cache.adelete(user_cache_key(user_id), *USER_COUNT_CACHE_KEYS)
 
-    logger.info(f"Deleted user: {user.username}")
-    return None
\ No newline at end of file
+    logger.info("Deleted user: %s", username)
+    return None
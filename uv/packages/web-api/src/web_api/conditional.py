@@ -0,0 +1,86 @@
+"""
+Conditional request helpers (ETag / Last-Modified validators).
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional, Tuple
+
+from fastapi import Request, Response, status
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (e.g. from SQLite) as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def make_validators(
+    versions: Iterable[Tuple[Any, datetime]], extra: str = "", content: bytes = b""
+) -> Tuple[str, Optional[datetime]]:
+    """Build a weak ETag and Last-Modified from ``(key, updated_at)`` pairs.
+
+    The ETag also hashes ``content``, the serialized body: timestamps can
+    be as coarse as a second (SQLite), so two writes within one second
+    would otherwise share a tag. ``extra`` covers anything else that
+    shapes the response but is not in the body.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(extra.encode())
+    digest.update(content)
+    last_modified = None
+    for key, updated_at in versions:
+        updated_at = _as_utc(updated_at)
+        digest.update(f"{key}:{updated_at.isoformat()};".encode())
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+    return f'W/"{digest.hexdigest()}"', last_modified
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime]
+) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the validators."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence; compare weakly (RFC 9110 13.1.2)
+        tags = [_strip_weak(tag) for tag in if_none_match.split(",")]
+        return "*" in tags or _strip_weak(etag) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    """Response headers carrying the validators."""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified_response(
+    etag: str,
+    last_modified: Optional[datetime],
+    headers: Optional[dict] = None,
+) -> Response:
+    """Empty 304 response carrying the validators and any extra headers."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={**(headers or {}), **validator_headers(etag, last_modified)},
+    )
@@ -5,14 +5,22 @@ FastAPI application main module.
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session
 
 from monorepo_core import get_settings, db_manager, logger
+from monorepo_core.cache import cache
+from monorepo_core.database import DatabaseBusyError
+from monorepo_core.metrics import metrics
 from monorepo_core.models import User, UserCreate, UserResponse
 
 from .api import api_router
+from .metrics import MetricsMiddleware, collect_cache_metrics, collect_pool_metrics
+from .ratelimit import RateLimitMiddleware
+from .readiness import ReadinessChecker
 
 
 @asynccontextmanager
@@ -21,11 +29,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Startup
     logger.info("Starting up the web application...")
     db_manager.create_tables()
+    app.state.readiness.start()
 
     yield
 
     # Shutdown
     logger.info("Shutting down the web application...")
+    await app.state.readiness.stop()
+    await db_manager.dispose()
+    await cache.aclose()
 
 
 def create_app() -> FastAPI:
@@ -40,6 +52,11 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
+    # Admission control; added first so it sits inside CORS and metrics,
+    # and throttled responses still carry CORS headers and are counted
+    if settings.rate_limit_enabled:
+        app.add_middleware(RateLimitMiddleware, router=app.router)
+
     # CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -47,8 +64,41 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "X-Next-Cursor",
+            "X-Total-Count",
+            "X-Total-Count-Mode",
+            "ETag",
+            "Last-Modified",
+            "X-DB-Query-Count",
+            "X-DB-Time-Ms",
+            "Retry-After",
+        ],
     )
 
+    # Request metrics (outermost, so it also times the CORS middleware);
+    # per-request query totals are only sent as headers in debug mode
+    app.add_middleware(
+        MetricsMiddleware, router=app.router, query_headers=settings.api_debug
+    )
+    metrics.register_collector("db_pool", collect_pool_metrics)
+    metrics.register_collector("cache", collect_cache_metrics)
+
+    app.state.readiness = ReadinessChecker()
+    metrics.register_collector("readiness", app.state.readiness.collect)
+
+    # Shed load with a fast 503 rather than queueing on an exhausted pool
+    @app.exception_handler(DatabaseBusyError)
+    @app.exception_handler(PoolTimeoutError)
+    async def database_busy_handler(request: Request, exc: Exception):
+        retry_after = getattr(exc, "retry_after", settings.api_busy_retry_after_seconds)
+        logger.warning("Database busy, rejecting %s %s", request.method, request.url.path)
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Database is busy, please retry"},
+            headers={"Retry-After": str(retry_after)},
+        )
+
     # Include API routes
     app.include_router(api_router, prefix="/api/v1")
 
@@ -63,9 +113,44 @@ def create_app() -> FastAPI:
 
     @app.get("/health")
     async def health_check():
-        """Health check endpoint."""
+        """Liveness check; deliberately touches no dependencies."""
         return {"status": "healthy", "version": "0.1.0"}
 
+    @app.get("/ready")
+    async def readiness_check():
+        """Readiness check against the database and Redis.
+
+        Serves the result of the background refresher, so frequent probes
+        do not add database load. Returns 503 while not ready.
+        """
+        result = await app.state.readiness.get()
+        return JSONResponse(
+            result,
+            status_code=(
+                status.HTTP_200_OK
+                if result["status"] == "ready"
+                else status.HTTP_503_SERVICE_UNAVAILABLE
+            ),
+            headers={"Cache-Control": "no-store"},
+        )
+
+    @app.get("/db/pool")
+    async def pool_stats():
+        """Live database connection pool statistics."""
+        return db_manager.pool_stats()
+
+    @app.get("/cache/stats")
+    async def cache_stats():
+        """Read-through cache hit/miss counters for this process."""
+        return cache.stats()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def prometheus_metrics():
+        """Metrics in the Prometheus text exposition format."""
+        return PlainTextResponse(
+            metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
     return app
 
 
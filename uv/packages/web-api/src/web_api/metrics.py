@@ -0,0 +1,186 @@
+"""
+Request metrics middleware and Prometheus collectors.
+"""
+
+import time
+from typing import Iterable, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from monorepo_core import db_manager
+from monorepo_core.cache import cache
+from monorepo_core.metrics import MetricFamily, MetricsRegistry, metrics
+from monorepo_core.query_stats import track_queries
+
+UNMATCHED_ROUTE = "unmatched"
+
+# Queries-per-request buckets; high counts usually mean an N+1 pattern
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _resolve_route(routes, scope: Scope, prefix: str = "") -> Tuple[Match, str]:
+    """Find the best matching route template, descending into included routers.
+
+    Newer FastAPI versions keep included routers as a single route whose
+    children carry paths relative to the include prefix.
+    """
+    partial: Tuple[Match, str] = (Match.NONE, UNMATCHED_ROUTE)
+    for route in routes:
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            include_prefix = route.include_context.prefix
+            path = scope["path"]
+            if not path.startswith(include_prefix):
+                continue
+            match, template = _resolve_route(
+                included.routes,
+                {**scope, "path": path[len(include_prefix):]},
+                prefix + include_prefix,
+            )
+        else:
+            match, _ = route.matches(scope)
+            template = prefix + getattr(route, "path", "")
+        if match == Match.FULL:
+            return match, template
+        if match == Match.PARTIAL and partial[0] == Match.NONE:
+            partial = (match, template)
+    return partial
+
+
+def route_template(router: Router, scope: Scope) -> str:
+    """Route template (e.g. ``/api/v1/users/{user_id}``) a request will hit."""
+    match, template = _resolve_route(router.routes, scope)
+    return template if match != Match.NONE else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, throughput and in-flight requests.
+
+    Requests are labelled with the route template (e.g.
+    ``/api/v1/users/{user_id}``) rather than the raw path, so label
+    cardinality stays bounded by the number of routes. SQL statements are
+    counted per request; with ``query_headers`` the totals are also sent
+    back as ``X-DB-Query-Count`` and ``X-DB-Time-Ms`` response headers.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        router: Router,
+        registry: MetricsRegistry = metrics,
+        query_headers: bool = False,
+    ):
+        self.app = app
+        self.router = router
+        self.query_headers = query_headers
+        self.requests = registry.counter(
+            "http_requests_total",
+            "HTTP requests by method, route and status code",
+            ("method", "route", "status"),
+        )
+        self.latency = registry.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency in seconds by method, route and status code",
+            ("method", "route", "status"),
+        )
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight",
+            "HTTP requests currently being served by method and route",
+            ("method", "route"),
+        )
+        self.db_queries = registry.histogram(
+            "http_request_db_queries",
+            "SQL statements executed per HTTP request by method and route",
+            ("method", "route"),
+            buckets=QUERY_COUNT_BUCKETS,
+        )
+        self.db_seconds = registry.histogram(
+            "http_request_db_seconds",
+            "Time spent in SQL statements per HTTP request by method and route",
+            ("method", "route"),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.router, scope)
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.query_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(queries.count)
+                    headers["X-DB-Time-Ms"] = f"{queries.total_ms:.2f}"
+            await send(message)
+
+        self.in_flight.inc((method, route))
+        start = time.perf_counter()
+        with track_queries(f"{method} {route}") as queries:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                duration = time.perf_counter() - start
+                self.in_flight.dec((method, route))
+                labels = (method, route, str(status_code))
+                self.requests.inc(labels)
+                self.latency.observe(duration, labels)
+                self.db_queries.observe(queries.count, (method, route))
+                self.db_seconds.observe(queries.total_seconds, (method, route))
+
+
+def collect_pool_metrics() -> Iterable[MetricFamily]:
+    """Database connection pool gauges and counters."""
+    fields = {
+        "size": ("db_pool_size", "gauge", "Connections kept in the pool"),
+        "checked_out": ("db_pool_checked_out", "gauge", "Connections currently checked out"),
+        "overflow": ("db_pool_overflow", "gauge", "Overflow connections currently open"),
+        "checkouts": ("db_pool_checkouts_total", "counter", "Successful pool checkouts"),
+        "timeouts": ("db_pool_timeouts_total", "counter", "Pool checkouts that timed out"),
+        "rejections": (
+            "db_pool_rejections_total", "counter", "Request sessions refused while the pool was exhausted"
+        ),
+        "wait_seconds_total": (
+            "db_pool_wait_seconds_total", "counter", "Seconds spent waiting for connections"
+        ),
+    }
+    samples = {key: [] for key in fields}
+    for database, engines in db_manager.pool_stats().items():
+        for engine, stats in engines.items():
+            labels = {"database": database, "engine": engine}
+            for key in fields:
+                if stats.get(key) is not None:
+                    samples[key].append((labels, stats[key]))
+
+    return [
+        (name, type_name, documentation, samples[key])
+        for key, (name, type_name, documentation) in fields.items()
+    ]
+
+
+def collect_cache_metrics() -> Iterable[MetricFamily]:
+    """Read-through cache counters."""
+    stats = cache.stats()
+    return [
+        (
+            "cache_requests_total",
+            "counter",
+            "Cache lookups by result",
+            [
+                ({"result": "local_hit"}, stats["local_hits"]),
+                ({"result": "redis_hit"}, stats["redis_hits"]),
+                ({"result": "miss"}, stats["misses"]),
+                ({"result": "coalesced"}, stats["coalesced"]),
+            ],
+        ),
+        ("cache_loads_total", "counter", "Cache misses loaded from the source", [({}, stats["loads"])]),
+        ("cache_redis_errors_total", "counter", "Redis errors seen by the cache", [({}, stats["redis_errors"])]),
+        ("cache_local_entries", "gauge", "Entries in the in-process cache tier", [({}, stats["local_size"])]),
+    ]
@@ -0,0 +1,335 @@
+"""
+Admission control: per-client token bucket rate limiting and concurrency limits.
+"""
+
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.routing import Router
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from monorepo_core import get_settings, logger
+from monorepo_core.metrics import MetricFamily, MetricsRegistry, metrics
+
+from .metrics import route_template
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is an optional extra
+    redis = None
+    aioredis = None
+
+
+class LocalTokenBuckets:
+    """In-process token buckets keyed by client and route.
+
+    The least recently used buckets are dropped beyond ``maxsize``; a
+    dropped bucket simply starts full again.
+    """
+
+    def __init__(self, rate: float, burst: int, maxsize: int = 100000):
+        """Initialize buckets refilling at ``rate`` tokens/second up to ``burst``."""
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take ``cost`` tokens; return ``(allowed, seconds until allowed)``."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= cost:
+                allowed, retry_after = True, 0.0
+                tokens -= cost
+            else:
+                allowed, retry_after = False, (cost - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Refill and take tokens atomically, timed by the Redis server clock so
+# every app instance sees the same bucket state.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisTokenBuckets:
+    """Token buckets stored in Redis and shared by every process.
+
+    Falls back to in-process buckets for ``retry_seconds`` after a Redis
+    error, so a Redis outage degrades limits instead of failing requests.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        rate: float,
+        burst: int,
+        prefix: str = "monorepo:ratelimit:",
+        timeout: float = 0.1,
+        retry_seconds: float = 30.0,
+    ):
+        """Initialize Redis-backed buckets."""
+        if aioredis is None:
+            raise RuntimeError("The redis package is required for the redis rate limit backend")
+        self.rate = rate
+        self.burst = burst
+        self.prefix = prefix
+        self.retry_seconds = retry_seconds
+        self.fallback = LocalTokenBuckets(rate, burst)
+        self.errors = 0
+        self._down_until = 0.0
+        self._client = aioredis.Redis.from_url(
+            redis_url, socket_timeout=timeout, socket_connect_timeout=timeout
+        )
+        self._script = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take ``cost`` tokens; return ``(allowed, seconds until allowed)``."""
+        if time.monotonic() >= self._down_until:
+            try:
+                allowed, retry_after = await self._script(
+                    keys=[self.prefix + key], args=[self.rate, self.burst, cost]
+                )
+                return bool(allowed), float(retry_after)
+            except redis.RedisError as e:
+                self.errors += 1
+                self._down_until = time.monotonic() + self.retry_seconds
+                logger.warning("Rate limiter falling back to local buckets: %s", e)
+        return await self.fallback.acquire(key, cost)
+
+    def __len__(self) -> int:
+        return len(self.fallback)
+
+
+class ConcurrencyLimiter:
+    """Caps requests in flight per client within this process."""
+
+    def __init__(self, max_concurrent: int):
+        """Initialize limiter allowing ``max_concurrent`` requests per key."""
+        self.max_concurrent = max_concurrent
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str) -> bool:
+        """Claim a slot for ``key`` if one is free."""
+        with self._lock:
+            count = self._in_flight.get(key, 0)
+            if count >= self.max_concurrent:
+                return False
+            self._in_flight[key] = count + 1
+            return True
+
+    def release(self, key: str):
+        """Free a slot claimed by ``try_acquire``."""
+        with self._lock:
+            count = self._in_flight.get(key, 0) - 1
+            if count > 0:
+                self._in_flight[key] = count
+            else:
+                self._in_flight.pop(key, None)
+
+    @property
+    def in_flight(self) -> int:
+        """Slots currently claimed across all keys."""
+        return sum(self._in_flight.values())
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+
+class RateLimitMiddleware:
+    """ASGI middleware shedding excess load with ``429 Too Many Requests``.
+
+    Each client gets a token bucket per route, so a batch job hammering one
+    endpoint is throttled without affecting its other calls or other
+    clients, plus a cap on requests in flight at once. Throttled responses
+    carry ``Retry-After`` with the time until a token is available.
+
+    Clients are keyed by address unless ``rate_limit_client_header`` names
+    an identifying header. ``X-Forwarded-For`` is only consulted when the
+    peer is one of ``rate_limit_trusted_proxies``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        router: Router,
+        registry: MetricsRegistry = metrics,
+        buckets=None,
+        max_concurrent: Optional[int] = None,
+        trusted_proxies: Optional[List[str]] = None,
+    ):
+        settings = get_settings()
+        self.app = app
+        self.router = router
+        self.client_header = settings.rate_limit_client_header
+        if trusted_proxies is None:
+            trusted_proxies = settings.rate_limit_trusted_proxies
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy, strict=False) for proxy in trusted_proxies
+        ]
+        self.exempt_paths = frozenset(settings.rate_limit_exempt_paths)
+        self.busy_retry_after = settings.api_busy_retry_after_seconds
+
+        if buckets is None:
+            if settings.rate_limit_backend == "redis":
+                buckets = RedisTokenBuckets(
+                    settings.redis_url,
+                    settings.rate_limit_requests_per_second,
+                    settings.rate_limit_burst,
+                )
+            else:
+                buckets = LocalTokenBuckets(
+                    settings.rate_limit_requests_per_second, settings.rate_limit_burst
+                )
+        self.buckets = buckets
+
+        if max_concurrent is None:
+            max_concurrent = settings.rate_limit_max_concurrent
+        self.concurrency = ConcurrencyLimiter(max_concurrent) if max_concurrent > 0 else None
+
+        self.decisions = registry.counter(
+            "rate_limit_decisions_total",
+            "Admission decisions by route and result",
+            ("route", "result"),
+        )
+        registry.register_collector("rate_limit", self.collect)
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def _client_key(self, scope: Scope) -> str:
+        if self.client_header:
+            header = self.client_header.lower().encode("latin-1")
+            for name, value in scope["headers"]:
+                if name == header:
+                    return value.decode("latin-1").strip()
+
+        client = scope.get("client")
+        peer = client[0] if client else "unknown"
+        if not self._trusted(peer):
+            return peer
+        hops = [
+            hop.strip()
+            for name, value in scope["headers"]
+            if name == b"x-forwarded-for"
+            for hop in value.decode("latin-1").split(",")
+            if hop.strip()
+        ]
+        # Each proxy appends the address it saw, so only entries right of
+        # the last untrusted one are genuine; anything further left can be
+        # sent by the client itself
+        for hop in reversed(hops):
+            if not self._trusted(hop):
+                return hop
+        return hops[0] if hops else peer
+
+    def collect(self) -> Iterable[MetricFamily]:
+        """Limiter state gauges."""
+        families = [
+            (
+                "rate_limit_tracked_buckets",
+                "gauge",
+                "Client and route token buckets held in this process",
+                [({}, len(self.buckets))],
+            ),
+        ]
+        if self.concurrency is not None:
+            families.append(
+                (
+                    "rate_limit_in_flight",
+                    "gauge",
+                    "Requests holding a concurrency slot in this process",
+                    [({}, self.concurrency.in_flight)],
+                )
+            )
+        if isinstance(self.buckets, RedisTokenBuckets):
+            families.append(
+                (
+                    "rate_limit_redis_errors_total",
+                    "counter",
+                    "Redis errors seen by the rate limiter",
+                    [({}, self.buckets.errors)],
+                )
+            )
+        return families
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, retry_after: float):
+        response = JSONResponse(
+            {"detail": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        client = self._client_key(scope)
+        route = route_template(self.router, scope)
+
+        allowed, retry_after = await self.buckets.acquire(
+            f"{client}:{scope['method']} {route}"
+        )
+        if not allowed:
+            self.decisions.inc((route, "rate_limited"))
+            await self._reject(scope, receive, send, retry_after)
+            return
+
+        if self.concurrency is None:
+            self.decisions.inc((route, "allowed"))
+            await self.app(scope, receive, send)
+            return
+
+        if not self.concurrency.try_acquire(client):
+            self.decisions.inc((route, "concurrency_limited"))
+            await self._reject(scope, receive, send, self.busy_retry_after)
+            return
+
+        self.decisions.inc((route, "allowed"))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.concurrency.release(client)
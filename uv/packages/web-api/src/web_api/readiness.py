@@ -0,0 +1,176 @@
+"""
+Readiness checks for the database and Redis, refreshed in the background.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from monorepo_core import db_manager, get_settings, logger
+from monorepo_core.metrics import MetricFamily
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is an optional extra
+    aioredis = None
+
+
+class ReadinessChecker:
+    """Runs dependency checks periodically and serves the latest result.
+
+    Probes read the cached result, so probe frequency and the number of
+    pods do not translate into load on the database. A result older than
+    a few refresh intervals (e.g. before the refresher starts, or if it
+    died) is recomputed inline, with concurrent probes sharing one run.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Initialize checker from explicit arguments or settings."""
+        settings = get_settings()
+        self.refresh_seconds = refresh_seconds or settings.readiness_refresh_seconds
+        self.timeout = timeout or settings.readiness_check_timeout_seconds
+        self.redis_required = settings.readiness_redis_required
+        if self.redis_required is None:
+            # The cache falls back to its in-process tier without Redis
+            self.redis_required = settings.rate_limit_backend == "redis"
+        self.redis_url = (
+            settings.redis_url
+            if settings.cache_redis_enabled or settings.rate_limit_backend == "redis"
+            else None
+        )
+
+        self.result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._redis = None
+        self._engine: Optional[AsyncEngine] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the latest result reports the service ready."""
+        return self.result is not None and self.result["status"] == "ready"
+
+    async def _check_database(self) -> Dict[str, Any]:
+        if self._engine is None:
+            # Connect outside the request pool: a busy pool (reported by
+            # the db_pool_* metrics) does not make the database unreachable
+            self._engine = create_async_engine(
+                db_manager.async_database_url, poolclass=NullPool
+            )
+        async with self._engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    async def _check_redis(self) -> Dict[str, Any]:
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(
+                self.redis_url,
+                socket_timeout=self.timeout,
+                socket_connect_timeout=self.timeout,
+            )
+        await self._redis.ping()
+        return {"ok": True}
+
+    async def _timed(self, check) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            result = {"ok": False, "error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    async def check(self) -> Dict[str, Any]:
+        """Run every check now and store the result."""
+        checks = {"database": self._timed(self._check_database)}
+        if self.redis_url is not None and aioredis is not None:
+            checks["redis"] = self._timed(self._check_redis)
+        results = dict(zip(checks, await asyncio.gather(*checks.values())))
+
+        required = ["database"] + (["redis"] if self.redis_required else [])
+        ready = all(results[name]["ok"] for name in required if name in results)
+        if self.ready and not ready:
+            logger.warning("Service not ready: %s", results)
+
+        self.result = {
+            "status": "ready" if ready else "not_ready",
+            "checks": results,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._checked_at = time.monotonic()
+        return self.result
+
+    async def get(self) -> Dict[str, Any]:
+        """Latest result, recomputed inline only when it has gone stale."""
+        if time.monotonic() - self._checked_at > 3 * self.refresh_seconds:
+            async with self._lock:
+                # Another probe may have refreshed it while we waited
+                if time.monotonic() - self._checked_at > 3 * self.refresh_seconds:
+                    await self.check()
+        return self.result
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.check()
+            except Exception as e:  # pragma: no cover - checks trap their errors
+                logger.error("Readiness refresh failed: %s", e)
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self):
+        """Start refreshing in the background."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop(self):
+        """Stop the background refresher and close connections."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    def collect(self) -> Iterable[MetricFamily]:
+        """Readiness gauges from the latest result."""
+        if self.result is None:
+            return []
+        return [
+            (
+                "readiness_check_ok",
+                "gauge",
+                "Whether each readiness check passed on its latest run",
+                [
+                    ({"check": name}, int(check["ok"]))
+                    for name, check in self.result["checks"].items()
+                ],
+            ),
+            (
+                "readiness_check_latency_seconds",
+                "gauge",
+                "Latency of each readiness check on its latest run",
+                [
+                    ({"check": name}, check["latency_ms"] / 1000)
+                    for name, check in self.result["checks"].items()
+                ],
+            ),
+        ]
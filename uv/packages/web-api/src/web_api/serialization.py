@@ -0,0 +1,79 @@
+"""
+Fast JSON serialization for user responses.
+"""
+
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import pydantic_core
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from monorepo_core.models import UserResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+# Built once at import instead of per request
+USER_ADAPTER = TypeAdapter(UserResponse)
+USER_LIST_ADAPTER = TypeAdapter(List[UserResponse])
+
+USER_FIELDS = tuple(UserResponse.model_fields)
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Check a comma-separated ``?fields=`` list against ``UserResponse``.
+
+    Returns the fields in schema order, or every field when ``fields`` is
+    None; raises ``ValueError`` for unknown or empty lists.
+    """
+    if fields is None:
+        return USER_FIELDS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(USER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    return tuple(field for field in USER_FIELDS if field in requested)
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode JSON-compatible data (including datetimes) to bytes."""
+    if orjson is not None:
+        # OPT_UTC_Z matches pydantic's "Z" suffix for UTC datetimes
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return pydantic_core.to_json(content)
+
+
+def users_to_json(
+    users: Iterable[Any], trusted: bool = True, fields: Sequence[str] = USER_FIELDS
+) -> bytes:
+    """Serialize ORM users as a ``List[UserResponse]`` JSON array.
+
+    Rows loaded from our own database are ``trusted``: their attributes are
+    read straight into dictionaries and encoded, skipping per-row model
+    validation; column-projected rows work too, as long as they carry
+    ``fields``. Untrusted input is validated through the precompiled adapter.
+    """
+    if not trusted:
+        return USER_LIST_ADAPTER.dump_json(
+            USER_LIST_ADAPTER.validate_python(users, from_attributes=True),
+            include=None if fields == USER_FIELDS else {"__all__": set(fields)},
+        )
+    return encode_json(
+        [{field: getattr(user, field) for field in fields} for user in users]
+    )
+
+
+def json_response(
+    content: bytes, status_code: int = 200, headers: Optional[dict] = None
+) -> Response:
+    """Response for an already encoded JSON body."""
+    return Response(
+        content=content,
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -2,14 +2,34 @@
 Tests for the main FastAPI application.
 """
 
+import asyncio
+
 import pytest
+from fastapi import APIRouter, FastAPI
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
+from monorepo_core.database import DatabaseManager
+from monorepo_core.metrics import MetricsRegistry
+from web_api import main as web_main
+from web_api import metrics as web_metrics
+from web_api import readiness as web_readiness
 from web_api.main import create_app
+from web_api.metrics import MetricsMiddleware
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Point the app at a temporary database."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    for module in (web_main, web_metrics, web_readiness):
+        monkeypatch.setattr(module, "db_manager", manager)
+    yield manager
+    asyncio.run(manager.dispose())
 
 
 @pytest.fixture
-def client():
+def client(manager):
     """Create test client."""
     app = create_app()
     return TestClient(app)
@@ -32,4 +52,117 @@ def test_health_check(client):
 
     data = response.json()
     assert data["status"] == "healthy"
-    assert data["version"] == "0.1.0"
\ No newline at end of file
+    assert data["version"] == "0.1.0"
+
+
+def test_pool_stats(client):
+    """Test pool statistics endpoint."""
+    response = client.get("/db/pool")
+    assert response.status_code == 200
+    assert "sync" in response.json()["primary"]
+
+
+def test_metrics_endpoint(client):
+    """Test request metrics are exposed per route template."""
+    client.get("/health")
+    client.get("/does-not-exist")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in text
+    assert 'route="unmatched",status="404"' in text
+    assert "http_request_duration_seconds_bucket" in text
+    assert "db_pool_checkouts_total" in text
+
+
+def test_metrics_route_label_under_included_router():
+    """Test path-parameter routes of included routers keep their template."""
+    items = APIRouter()
+
+    @items.get("/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(items, prefix="/api/v1/items")
+    registry = MetricsRegistry()
+    app.add_middleware(MetricsMiddleware, router=app.router, registry=registry)
+
+    assert TestClient(app).get("/api/v1/items/42").status_code == 200
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/items/{item_id}",status="200"} 1'
+        in registry.render()
+    )
+
+
+def test_readiness_probe(client, monkeypatch):
+    """Test /ready reports dependency checks and caches the result."""
+    readiness = client.app.state.readiness
+    monkeypatch.setattr(readiness, "redis_url", None)
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["checks"]["database"]["ok"] is True
+
+    # Served from the cached result until it goes stale
+    response = client.get("/ready")
+    assert response.json()["checked_at"] == data["checked_at"]
+    assert 'readiness_check_ok{check="database"} 1' in client.get("/metrics").text
+
+
+def test_readiness_probe_not_ready(client, monkeypatch):
+    """Test /ready returns 503 when a required dependency is down."""
+    readiness = client.app.state.readiness
+    monkeypatch.setattr(readiness, "redis_url", "redis://127.0.0.1:1/0")
+    monkeypatch.setattr(readiness, "redis_required", True)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    data = response.json()
+    assert data["status"] == "not_ready"
+    assert data["checks"]["redis"]["ok"] is False
+    assert data["checks"]["database"]["ok"] is True
+
+
+def test_readiness_reports_optional_redis(client, monkeypatch):
+    """Test a Redis outage is reported but only required with Redis rate limits."""
+    readiness = client.app.state.readiness
+    assert readiness.redis_required is False
+    monkeypatch.setattr(readiness, "redis_url", "redis://127.0.0.1:1/0")
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["checks"]["redis"]["ok"] is False
+
+
+def test_readiness_ignores_pool_saturation(client, manager, monkeypatch):
+    """Test an exhausted request pool does not make the service unready."""
+    readiness = client.app.state.readiness
+    monkeypatch.setattr(readiness, "redis_url", None)
+
+    def exhausted():
+        raise PoolTimeoutError("QueuePool limit reached")
+
+    monkeypatch.setattr(manager.async_engine.sync_engine.pool, "connect", exhausted)
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["checks"]["database"]["ok"] is True
+
+
+def test_readiness_background_refresh(client, monkeypatch):
+    """Test the lifespan starts the background refresher."""
+    readiness = client.app.state.readiness
+    monkeypatch.setattr(readiness, "redis_url", None)
+
+    with TestClient(client.app) as running:
+        assert readiness._task is not None
+        assert running.get("/ready").status_code == 200
+    assert readiness._task is None
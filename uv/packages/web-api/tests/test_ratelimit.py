@@ -0,0 +1,121 @@
+"""
+Tests for rate limiting middleware.
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from monorepo_core.metrics import MetricsRegistry
+from web_api.ratelimit import (
+    ConcurrencyLimiter,
+    LocalTokenBuckets,
+    RateLimitMiddleware,
+    RedisTokenBuckets,
+)
+
+
+def _app(buckets, registry, max_concurrent=0):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        router=app.router,
+        registry=registry,
+        buckets=buckets,
+        max_concurrent=max_concurrent,
+    )
+    return app
+
+
+def test_token_buckets():
+    """Test bursts are allowed and the wait for the next token is reported."""
+    buckets = LocalTokenBuckets(rate=2.0, burst=2)
+
+    async def run():
+        return [await buckets.acquire("client") for _ in range(3)]
+
+    first, second, third = asyncio.run(run())
+    assert first[0] and second[0]
+    assert not third[0]
+    assert 0.4 < third[1] <= 0.5
+    assert asyncio.run(buckets.acquire("other"))[0]
+
+
+def test_middleware_throttles_per_client_and_route():
+    """Test throttled requests get 429 with Retry-After, other routes pass."""
+    registry = MetricsRegistry()
+    client = TestClient(_app(LocalTokenBuckets(rate=0.5, burst=2), registry))
+
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+
+    response = client.get("/items/3")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+    # Exempt paths are never throttled
+    for _ in range(5):
+        assert client.get("/health").status_code == 200
+
+    text = registry.render()
+    assert 'rate_limit_decisions_total{route="/items/{item_id}",result="allowed"} 2' in text
+    assert 'rate_limit_decisions_total{route="/items/{item_id}",result="rate_limited"} 1' in text
+    assert "rate_limit_tracked_buckets 1" in text
+
+
+def test_concurrency_limiter():
+    """Test slots are capped per key and released."""
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    assert limiter.try_acquire("a")
+    assert not limiter.try_acquire("a")
+    assert limiter.try_acquire("b")
+    assert limiter.in_flight == 2
+
+    limiter.release("a")
+    assert limiter.try_acquire("a")
+
+
+def test_redis_outage_falls_back_to_local_buckets():
+    """Test an unreachable Redis degrades to in-process limits."""
+    buckets = RedisTokenBuckets("redis://127.0.0.1:1/0", rate=1.0, burst=1)
+
+    async def run():
+        return [await buckets.acquire("client") for _ in range(2)]
+
+    first, second = asyncio.run(run())
+    assert first[0]
+    assert not second[0]
+    assert buckets.errors == 1
+
+
+def test_client_key_trusts_only_configured_proxies():
+    """Test forwarded addresses are used only behind a trusted proxy."""
+    middleware = RateLimitMiddleware(
+        FastAPI(),
+        router=None,
+        registry=MetricsRegistry(),
+        buckets=LocalTokenBuckets(rate=1.0, burst=1),
+        trusted_proxies=["10.0.0.0/8"],
+    )
+
+    def key(peer, forwarded=None):
+        headers = [] if forwarded is None else [(b"x-forwarded-for", forwarded.encode())]
+        return middleware._client_key({"client": (peer, 1234), "headers": headers})
+
+    # Direct clients cannot claim another address
+    assert key("203.0.113.9", "198.51.100.1") == "203.0.113.9"
+    # A spoofed left-most entry is ignored in favour of the hop the proxy saw
+    assert key("10.0.0.2", "198.51.100.1, 203.0.113.9") == "203.0.113.9"
+    assert key("10.0.0.2", "203.0.113.9, 10.0.0.5") == "203.0.113.9"
+    assert key("10.0.0.2", "10.0.0.7") == "10.0.0.7"
+    assert key("10.0.0.2") == "10.0.0.2"
@@ -0,0 +1,102 @@
+"""
+Tests and opt-in benchmark for the fast user serialization path.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from monorepo_core.models import User, UserResponse
+from web_api.serialization import USER_FIELDS, encode_json, parse_fields, users_to_json
+
+# Timings are noisy on shared machines, so benchmarks only run when asked
+benchmark = pytest.mark.skipif(
+    not os.environ.get("MONOREPO_BENCHMARKS"),
+    reason="set MONOREPO_BENCHMARKS=1 to run benchmarks",
+)
+
+
+def _users(count: int) -> List[User]:
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        User(
+            id=i,
+            email=f"user{i}@example.com",
+            username=f"user{i}",
+            full_name=None if i % 3 else f"User {i}",
+            is_active=True,
+            created_at=created + timedelta(seconds=i),
+            updated_at=created + timedelta(seconds=i, microseconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def _standard_path(users: List[User]) -> bytes:
+    """Serialize the way FastAPI's response_model path does."""
+    validated = TypeAdapter(List[UserResponse]).validate_python(users, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def test_fast_path_matches_standard_path():
+    """Test trusted and validated fast paths produce the standard output."""
+    users = _users(10)
+    expected = json.loads(_standard_path(users))
+
+    assert json.loads(users_to_json(users)) == expected
+    assert json.loads(users_to_json(users, trusted=False)) == expected
+
+
+def test_encode_json_matches_stdlib():
+    """Test encode_json emits the same bytes as the standard json module."""
+    payload = [
+        UserResponse.model_validate(user).model_dump(mode="json")
+        for user in _users(3)
+    ]
+    payload[0]["full_name"] = "Zoë \"Q\""
+
+    expected = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    assert encode_json(payload) == expected
+
+
+@benchmark
+def test_serialization_benchmark():
+    """Benchmark serialization time per 1,000 users, before and after."""
+    users = _users(1000)
+
+    def best_of(function, rounds=5):
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            function(users)
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    standard_ms = best_of(_standard_path)
+    validated_ms = best_of(lambda rows: users_to_json(rows, trusted=False))
+    trusted_ms = best_of(users_to_json)
+
+    assert trusted_ms < standard_ms, (
+        f"per 1,000 users: standard {standard_ms:.2f} ms, "
+        f"precompiled+validated {validated_ms:.2f} ms, trusted {trusted_ms:.2f} ms"
+    )
+
+
+def test_sparse_fields():
+    """Test field lists are checked and limit the serialized keys."""
+    assert parse_fields(None) == USER_FIELDS
+    assert parse_fields(" id ,username,id") == ("username", "id")
+    for invalid in ("", "username,secret"):
+        with pytest.raises(ValueError):
+            parse_fields(invalid)
+
+    users = _users(2)
+    expected = [{"id": 0, "username": "user0"}, {"id": 1, "username": "user1"}]
+    assert json.loads(users_to_json(users, fields=("id", "username"))) == expected
+    assert json.loads(users_to_json(users, trusted=False, fields=("id", "username"))) == expected
@@ -0,0 +1,548 @@
+"""
+Tests for the user API endpoints.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from monorepo_core import counting
+from monorepo_core.cache import TwoTierCache
+from monorepo_core.database import DatabaseManager
+from web_api.api import users
+from web_api.main import create_app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Create test client backed by a temporary database."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+    manager.create_tables()
+    monkeypatch.setattr(users, "db_manager", manager)
+    local_cache = TwoTierCache(enabled=True, use_redis=False)
+    monkeypatch.setattr(users, "cache", local_cache)
+    monkeypatch.setattr(counting, "cache", local_cache)
+
+    yield TestClient(create_app())
+
+    asyncio.run(manager.dispose())
+
+
+def _create(client, username):
+    response = client.post(
+        "/api/v1/users/",
+        json={"email": f"{username}@example.com", "username": username},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_user_crud(client):
+    """Test create, read, update and delete."""
+    user = _create(client, "alice")
+
+    response = client.get(f"/api/v1/users/{user['id']}")
+    assert response.status_code == 200
+    assert response.json()["username"] == "alice"
+
+    response = client.put(
+        f"/api/v1/users/{user['id']}",
+        json={"email": "alice@example.org", "username": "alice", "full_name": "Alice"},
+    )
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Alice"
+
+    response = client.delete(f"/api/v1/users/{user['id']}")
+    assert response.status_code == 204
+    assert client.get(f"/api/v1/users/{user['id']}").status_code == 404
+
+
+def test_create_duplicate_user(client):
+    """Test duplicate users are rejected."""
+    _create(client, "alice")
+
+    response = client.post(
+        "/api/v1/users/",
+        json={"email": "alice@example.com", "username": "alice"},
+    )
+    assert response.status_code == 400
+
+
+def test_list_users(client):
+    """Test listing users with offset paging."""
+    for name in ("alice", "bob", "carol"):
+        _create(client, name)
+
+    response = client.get("/api/v1/users/", params={"skip": 1, "limit": 1})
+    assert response.status_code == 200
+    assert [u["username"] for u in response.json()] == ["bob"]
+
+
+@pytest.mark.parametrize("order", ["id", "created_at"])
+def test_list_users_cursor_pagination(client, order):
+    """Test walking every page with the keyset cursor."""
+    names = [f"user{i}" for i in range(7)]
+    for name in names:
+        _create(client, name)
+
+    seen = []
+    params = {"limit": 3, "order": order}
+    while True:
+        response = client.get("/api/v1/users/", params=params)
+        assert response.status_code == 200
+        seen.extend(u["username"] for u in response.json())
+
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 3, "order": order, "cursor": cursor}
+
+    assert seen == names
+
+
+def test_list_users_invalid_cursor(client):
+    """Test malformed or mismatched cursors are rejected."""
+    for name in ("alice", "bob"):
+        _create(client, name)
+
+    response = client.get("/api/v1/users/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+    cursor = client.get("/api/v1/users/", params={"limit": 1}).headers["X-Next-Cursor"]
+    response = client.get(
+        "/api/v1/users/", params={"cursor": cursor, "order": "created_at"}
+    )
+    assert response.status_code == 400
+
+
+def test_bulk_create_users(client):
+    """Test bulk import reports created, duplicate and invalid rows."""
+    _create(client, "existing")
+
+    response = client.post(
+        "/api/v1/users/bulk",
+        json=[
+            {"email": "a@example.com", "username": "a"},
+            {"email": "existing@example.com", "username": "other"},
+            {"email": "b@example.com"},
+            {"email": "a@example.com", "username": "a2"},
+            {"email": "c@example.com", "username": "c", "full_name": "C"},
+        ],
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 3
+    assert [r["status"] for r in data["results"]] == [
+        "created", "duplicate", "invalid", "duplicate", "created"
+    ]
+
+    user_id = data["results"][4]["id"]
+    assert client.get(f"/api/v1/users/{user_id}").json()["full_name"] == "C"
+
+
+def test_bulk_create_users_ndjson(client, monkeypatch):
+    """Test NDJSON bodies are imported across several chunks."""
+    monkeypatch.setattr(users.get_settings(), "api_bulk_chunk_size", 2)
+    lines = [json.dumps({"email": f"u{i}@example.com", "username": f"u{i}"}) for i in range(5)]
+    lines.insert(2, "{not json")
+
+    response = client.post(
+        "/api/v1/users/bulk",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["created"] == 5
+    assert data["results"][2]["status"] == "invalid"
+    assert len(client.get("/api/v1/users/").json()) == 5
+
+
+def test_export_users(client, monkeypatch):
+    """Test NDJSON and CSV exports stream every user."""
+    monkeypatch.setattr(users.get_settings(), "api_export_chunk_size", 2)
+    for name in ("alice", "bob", "carol"):
+        _create(client, name)
+
+    response = client.get("/api/v1/users/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["username"] for row in rows] == ["alice", "bob", "carol"]
+
+    response = client.get("/api/v1/users/export", params={"format": "csv"})
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].split(",")[:2] == ["email", "username"]
+    assert len(lines) == 4
+
+
+def test_get_user_is_cached_and_invalidated(client):
+    """Test reads are served from cache and writes invalidate it."""
+    user = _create(client, "alice")
+
+    client.get(f"/api/v1/users/{user['id']}")
+    client.get(f"/api/v1/users/{user['id']}")
+    assert users.cache.stats()["local_hits"] == 1
+
+    client.put(
+        f"/api/v1/users/{user['id']}",
+        json={"email": "alice@example.com", "username": "alice", "full_name": "New"},
+    )
+    assert client.get(f"/api/v1/users/{user['id']}").json()["full_name"] == "New"
+
+    client.delete(f"/api/v1/users/{user['id']}")
+    assert client.get(f"/api/v1/users/{user['id']}").status_code == 404
+
+
+def test_get_user_conditional_requests(client):
+    """Test ETag and Last-Modified validators on a single user."""
+    user = _create(client, "alice")
+    url = f"/api/v1/users/{user['id']}"
+
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    response = client.get(url, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = client.get(url, headers={"If-None-Match": 'W/"stale"'})
+    assert response.status_code == 200
+
+
+def test_list_users_revalidates_after_delete(client):
+    """Test a deleted row invalidates list pages under either validator."""
+    ids = [_create(client, name)["id"] for name in ("a", "b", "c")]
+    response = client.get("/api/v1/users/")
+    assert "Last-Modified" not in response.headers
+    etag = response.headers["ETag"]
+
+    client.delete(f"/api/v1/users/{ids[2]}")
+    # Later than every remaining row's updated_at
+    since = "Fri, 01 Jan 2100 00:00:00 GMT"
+    response = client.get("/api/v1/users/", headers={"If-Modified-Since": since})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    response = client.get("/api/v1/users/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_etag_changes_on_same_second_update(client):
+    """Test a write within the timestamp's resolution still changes the ETag."""
+    user = _create(client, "alice")
+    url = f"/api/v1/users/{user['id']}"
+    user_etag = client.get(url).headers["ETag"]
+    list_etag = client.get("/api/v1/users/").headers["ETag"]
+
+    client.patch(url, json={"full_name": "Alice Renamed"})
+
+    response = client.get(url, headers={"If-None-Match": user_etag})
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Alice Renamed"
+    response = client.get("/api/v1/users/", headers={"If-None-Match": list_etag})
+    assert response.status_code == 200
+
+
+def test_list_users_conditional_requests(client):
+    """Test list pages revalidate until the page changes."""
+    for name in ("alice", "bob"):
+        _create(client, name)
+
+    response = client.get("/api/v1/users/")
+    etag = response.headers["ETag"]
+
+    response = client.get("/api/v1/users/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    _create(client, "carol")
+    response = client.get("/api/v1/users/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+
+def test_query_count_headers(client, monkeypatch):
+    """Test per-request query totals are exposed in debug mode."""
+    from monorepo_core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "api_debug", True)
+    debug_client = TestClient(create_app())
+    user = _create(debug_client, "alice")
+
+    response = debug_client.get(f"/api/v1/users/{user['id']}")
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+
+    # Served from the read-through cache without touching the database
+    response = debug_client.get(f"/api/v1/users/{user['id']}")
+    assert response.headers["X-DB-Query-Count"] == "0"
+
+    assert "X-DB-Query-Count" not in client.get("/health").headers
+    text = client.get("/metrics").text
+    assert (
+        'http_request_db_queries_count{method="GET",route="/api/v1/users/{user_id}"}'
+        in text
+    )
+    assert "db_queries_total" in text
+
+
+def test_patch_user(client):
+    """Test PATCH only changes the fields sent."""
+    user = _create(client, "alice")
+    _create(client, "bob")
+
+    response = client.patch(f"/api/v1/users/{user['id']}", json={"full_name": "Alice"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["full_name"] == "Alice"
+    assert data["email"] == "alice@example.com"
+
+    response = client.patch(f"/api/v1/users/{user['id']}", json={})
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Alice"
+
+    assert client.patch(f"/api/v1/users/{user['id']}", json={"email": None}).status_code == 422
+    assert client.patch(f"/api/v1/users/{user['id']}", json={"username": "bob"}).status_code == 400
+    assert client.patch("/api/v1/users/999", json={"full_name": "X"}).status_code == 404
+    assert client.delete("/api/v1/users/999").status_code == 404
+
+
+def test_writes_use_single_statement(client, monkeypatch):
+    """Test create, update and delete each run one statement with RETURNING."""
+    from monorepo_core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "api_debug", True)
+    debug_client = TestClient(create_app())
+
+    response = debug_client.post(
+        "/api/v1/users/", json={"email": "a@example.com", "username": "alice"}
+    )
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert response.json()["created_at"]
+    user_id = response.json()["id"]
+
+    response = debug_client.put(
+        f"/api/v1/users/{user_id}",
+        json={"email": "a@example.org", "username": "alice"},
+    )
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert response.json()["email"] == "a@example.org"
+
+    response = debug_client.delete(f"/api/v1/users/{user_id}")
+    assert response.status_code == 204
+    assert response.headers["X-DB-Query-Count"] == "1"
+
+
+def test_writes_without_returning(client, monkeypatch):
+    """Test the fallback write path for backends without RETURNING."""
+    dialect = users.db_manager.async_engine.dialect
+    for flag in ("insert_returning", "update_returning", "delete_returning"):
+        monkeypatch.setattr(dialect, flag, False)
+
+    user = _create(client, "alice")
+    assert user["created_at"]
+
+    response = client.patch(f"/api/v1/users/{user['id']}", json={"full_name": "Alice"})
+    assert response.json()["full_name"] == "Alice"
+
+    assert client.delete(f"/api/v1/users/{user['id']}").status_code == 204
+    assert client.delete(f"/api/v1/users/{user['id']}").status_code == 404
+
+
+def test_busy_pool_returns_503(client, monkeypatch):
+    """Test an exhausted pool yields a fast 503 with Retry-After."""
+    node = users.db_manager._primary
+    monkeypatch.setattr(node, "saturated", lambda use_async=False: True)
+
+    response = client.get("/api/v1/users/1")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert node.async_pool_stats.rejections == 1
+
+
+def test_busy_pool_serves_cached_users(client, monkeypatch):
+    """Test requests answered from the cache are not refused on a busy pool."""
+    user = _create(client, "alice")
+    url = f"/api/v1/users/{user['id']}"
+    assert client.get(url).status_code == 200
+
+    node = users.db_manager._primary
+    monkeypatch.setattr(node, "saturated", lambda use_async=False: True)
+    for _ in range(20):
+        assert client.get(url).status_code == 200
+    assert client.get(f"/api/v1/users/{user['id'] + 1}").status_code == 503
+    assert node.async_pool_stats.rejections == 1
+
+
+def test_list_users_active_filter(client):
+    """Test filtering and paging by is_active."""
+    ids = [_create(client, f"user{i}")["id"] for i in range(5)]
+    for user_id in ids[1::2]:
+        response = client.patch(f"/api/v1/users/{user_id}", json={"is_active": False})
+        assert response.json()["is_active"] is False
+
+    response = client.get("/api/v1/users/", params={"active": "true", "limit": 2})
+    assert [u["id"] for u in response.json()] == [ids[0], ids[2]]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/api/v1/users/", params={"active": "true", "cursor": cursor})
+    assert [u["id"] for u in response.json()] == [ids[4]]
+
+    # A cursor only continues the filter it was issued for
+    response = client.get("/api/v1/users/", params={"cursor": cursor})
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/users/", params={"active": "false"})
+    assert [u["id"] for u in response.json()] == ids[1::2]
+    assert len(client.get("/api/v1/users/").json()) == 5
+
+
+def test_search_users(client):
+    """Test ranked, paginated search."""
+    for name in ("alice", "malice", "bob"):
+        _create(client, name)
+
+    response = client.get("/api/v1/users/search", params={"q": "alice"})
+    assert response.status_code == 200
+    assert [u["username"] for u in response.json()] == ["alice", "malice"]
+
+    response = client.get("/api/v1/users/search", params={"q": "alice", "skip": 1, "limit": 1})
+    assert [u["username"] for u in response.json()] == ["malice"]
+
+    assert client.get("/api/v1/users/search", params={"q": "ab"}).status_code == 422
+    assert client.get("/api/v1/users/search", params={"q": "a b c"}).status_code == 400
+
+
+def test_list_users_by_ids(client, monkeypatch):
+    """Test fetching several users by id with one query, in request order."""
+    from monorepo_core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "api_debug", True)
+    debug_client = TestClient(create_app())
+    ids = [_create(client, f"user{i}")["id"] for i in range(4)]
+
+    wanted = [ids[2], 9999, ids[0], ids[2], ids[3]]
+    response = debug_client.get("/api/v1/users/", params={"ids": ",".join(map(str, wanted))})
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == [ids[2], ids[0], ids[3]]
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert response.headers["ETag"]
+
+    assert client.get("/api/v1/users/", params={"ids": "1,x"}).status_code == 400
+    assert client.get("/api/v1/users/", params={"ids": ","}).status_code == 400
+
+
+def test_list_users_sparse_fields(client):
+    """Test ?fields= narrows both the SQL projection and the response."""
+    statements = []
+    ids = [_create(client, f"user{i}")["id"] for i in range(3)]
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = users.db_manager.async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(
+            "/api/v1/users/", params={"fields": "username,id", "order": "created_at", "limit": 2}
+        )
+        by_ids = client.get(
+            "/api/v1/users/", params={"fields": "email", "ids": f"{ids[1]},{ids[0]}"}
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert response.json() == [{"username": "user0", "id": ids[0]}, {"username": "user1", "id": ids[1]}]
+    assert by_ids.json() == [{"email": "user1@example.com"}, {"email": "user0@example.com"}]
+    page_sql, ids_sql = [sql for sql in statements if "FROM users" in sql]
+    assert "email" not in page_sql and "full_name" not in page_sql
+    assert "email" in ids_sql and "full_name" not in ids_sql
+
+    # Cursors keep working and different projections get different ETags
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(
+        "/api/v1/users/", params={"fields": "username", "order": "created_at", "cursor": cursor}
+    )
+    assert response.json() == [{"username": "user2"}]
+    full = client.get("/api/v1/users/", params={"order": "created_at", "limit": 2})
+    assert full.headers["ETag"] != client.get(
+        "/api/v1/users/", params={"fields": "username,id", "order": "created_at", "limit": 2}
+    ).headers["ETag"]
+
+    response = client.get("/api/v1/users/", params={"fields": "username,password"})
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+
+
+def test_list_users_total_count(client):
+    """Test X-Total-Count in each mode and invalidation of cached counts."""
+    ids = [_create(client, f"user{i}")["id"] for i in range(3)]
+    client.patch(f"/api/v1/users/{ids[0]}", json={"is_active": False})
+
+    def total(**params):
+        response = client.get("/api/v1/users/", params={"limit": 1, **params})
+        return response.headers.get("X-Total-Count"), response.headers.get("X-Total-Count-Mode")
+
+    assert total() == (None, None)
+    assert total(count="exact") == ("3", "exact")
+    assert total(count="exact", active="false") == ("1", "exact")
+    assert total(count="cached", active="true") == ("2", "cached")
+
+    # Cached counts are dropped by writes
+    _create(client, "user3")
+    assert total(count="cached", active="true") == ("3", "cached")
+    client.patch(f"/api/v1/users/{ids[1]}", json={"is_active": False})
+    assert total(count="cached", active="true") == ("2", "cached")
+    client.delete(f"/api/v1/users/{ids[2]}")
+    assert total(count="cached") == ("3", "cached")
+
+    # No statistics yet, so estimates fall back to the cached count
+    assert total(count="estimated") == ("3", "cached")
+    with users.db_manager.engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    assert total(count="estimated") == ("3", "estimated")
+    assert total(count="estimated", active="true") == ("1", "estimated")
+
+    # With ids the total is the number of users found, whatever the mode
+    wanted = ",".join(map(str, [ids[0], ids[1], 9999]))
+    assert total(ids=wanted, count="cached") == ("2", "exact")
+    assert total(ids=wanted, count="estimated", active="false") == ("2", "exact")
+    assert total(ids=wanted, count="exact", active="true") == ("0", "exact")
+
+    assert client.get("/api/v1/users/", params={"count": "roughly"}).status_code == 422
+
+
+@pytest.mark.parametrize("order", ["id", "created_at"])
+def test_list_users_cursor_after_anchor_deleted(client, order):
+    """Test a cursor still seeks correctly when its anchor row is gone."""
+    names = [f"user{i}" for i in range(5)]
+    ids = [_create(client, name)["id"] for name in names]
+
+    response = client.get("/api/v1/users/", params={"limit": 2, "order": order})
+    cursor = response.headers["X-Next-Cursor"]
+    assert client.delete(f"/api/v1/users/{ids[1]}").status_code == 204
+
+    seen = []
+    params = {"limit": 2, "order": order, "cursor": cursor}
+    while True:
+        response = client.get("/api/v1/users/", params=params)
+        assert response.status_code == 200
+        seen.extend(u["username"] for u in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "order": order, "cursor": cursor}
+
+    assert seen == names[2:]
@@ -2,9 +2,14 @@
 Celery application configuration.
 """
 
+from contextvars import Token
+from typing import Dict, Tuple
+
 from celery import Celery
+from celery.signals import task_postrun, task_prerun
 
 from monorepo_core import get_settings, logger
+from monorepo_core.query_stats import QueryStats, start_query_stats, stop_query_stats
 
 # Get settings
 settings = get_settings()
@@ -32,6 +37,29 @@ celery_app.conf.update(
     worker_max_tasks_per_child=1000,
 )
 
+# SQL statements run by a task are attributed to it in the slow-query log
+_task_query_stats: Dict[str, Tuple[QueryStats, Token]] = {}
+
+
+@task_prerun.connect
+def start_task_query_stats(task_id=None, task=None, **kwargs):
+    """Start counting SQL statements for a task."""
+    _task_query_stats[task_id] = start_query_stats(f"task {task.name}")
+
+
+@task_postrun.connect
+def finish_task_query_stats(task_id=None, task=None, **kwargs):
+    """Stop counting SQL statements for a task and log the totals."""
+    entry = _task_query_stats.pop(task_id, None)
+    if entry is None:
+        return
+    stats, token = entry
+    stop_query_stats(token)
+    logger.debug(
+        "Task %s ran %d queries in %.1f ms", task.name, stats.count, stats.total_ms
+    )
+
+
 # Logging
 logger.info("Celery app configured successfully")
 
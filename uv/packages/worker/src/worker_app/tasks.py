@@ -38,7 +38,7 @@ def process_user_task(self, user_id: int, action: str = "welcome") -> Dict[str,
             if not user:
                 raise ValueError(f"User with ID {user_id} not found")
 
-            logger.info(f"Processing user: {user.username} (action: {action})")
+            logger.info("Processing user: %s (action: %s)", user.username, action)
 
             # Update progress
             current_task.update_state(
@@ -80,11 +80,11 @@ def process_user_task(self, user_id: int, action: str = "welcome") -> Dict[str,
                 "status": "completed"
             }
 
-            logger.info(f"Completed processing user {user.username}")
+            logger.info("Completed processing user %s", user.username)
             return final_result
 
     except Exception as e:
-        logger.error(f"Error processing user {user_id}: {str(e)}")
+        logger.error("Error processing user %s: %s", user_id, e)
         current_task.update_state(
             state="FAILURE",
             meta={"error": str(e), "user_id": user_id}
@@ -119,7 +119,7 @@ def send_email_task(
             meta={"step": "Preparing email", "progress": 0}
         )
 
-        logger.info(f"Sending email to {to_email}")
+        logger.info("Sending email to %s", to_email)
 
         # Update progress
         current_task.update_state(
@@ -140,7 +140,7 @@ def send_email_task(
 
         # In a real application, you would use a proper email service
         # For now, we'll just log the email
-        logger.info(f"Email sent to {to_email}: {subject}")
+        logger.info("Email sent to %s: %s", to_email, subject)
 
         result = {
             "to_email": to_email,
@@ -152,7 +152,7 @@ def send_email_task(
         return result
 
     except Exception as e:
-        logger.error(f"Error sending email to {to_email}: {str(e)}")
+        logger.error("Error sending email to %s: %s", to_email, e)
         current_task.update_state(
             state="FAILURE",
             meta={"error": str(e), "to_email": to_email}